@@ -14,7 +14,7 @@ from app.config import settings
 config = context.config
 
 # Override the sqlalchemy.url with our settings
-config.set_main_option("sqlalchemy.url", settings.databaseUrl)
+config.set_main_option("sqlalchemy.url", settings.effective_database_url)
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
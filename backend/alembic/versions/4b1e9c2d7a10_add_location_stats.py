@@ -0,0 +1,41 @@
+"""Add location_stats
+
+Revision ID: 4b1e9c2d7a10
+Revises: 732795f39ece
+Create Date: 2026-10-17 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e9c2d7a10'
+down_revision: Union[str, None] = '732795f39ece'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'location_stats',
+        sa.Column('locationId', sa.String(), nullable=False),
+        sa.Column('avgRating', sa.Float(), nullable=False),
+        sa.Column('reviewCount', sa.Integer(), nullable=False),
+        sa.Column('ratingSum', sa.Integer(), nullable=False),
+        sa.Column('updatedAt', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['locationId'], ['locations.id'], ),
+        sa.PrimaryKeyConstraint('locationId')
+    )
+    # Backfill from existing reviews
+    op.execute(
+        'INSERT INTO location_stats ("locationId", "avgRating", "reviewCount", "ratingSum", "updatedAt") '
+        'SELECT "locationId", AVG(rating), COUNT(*), SUM(rating), CURRENT_TIMESTAMP '
+        'FROM reviews GROUP BY "locationId"'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('location_stats')
@@ -0,0 +1,35 @@
+"""Add geocode_cache
+
+Revision ID: 9d3f5a81c2e4
+Revises: 4b1e9c2d7a10
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f5a81c2e4'
+down_revision: Union[str, None] = '4b1e9c2d7a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'geocode_cache',
+        sa.Column('query', sa.String(), nullable=False),
+        sa.Column('found', sa.Boolean(), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('address', sa.String(), nullable=True),
+        sa.Column('expiresAt', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('query')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('geocode_cache')
@@ -0,0 +1,39 @@
+"""Add indexes for hot queries
+
+Revision ID: a3d6f0c2e915
+Revises: f2a9c4e7b831
+Create Date: 2026-10-17 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d6f0c2e915'
+down_revision: Union[str, None] = 'f2a9c4e7b831'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# reviews.locationId is served by the leading column of ix_reviews_location_helpfulness
+INDEXES = [
+    ('ix_review_ratings_review_rating', 'review_ratings', ['reviewId', 'rating']),
+    ('ix_review_ratings_user_review', 'review_ratings', ['userId', 'reviewId']),
+    ('ix_chat_participants_userId', 'chat_participants', ['userId']),
+    ('ix_chat_participants_chatId', 'chat_participants', ['chatId']),
+    ('ix_chat_messages_chat_created', 'chat_messages', ['chatId', 'createdAt']),
+    ('ix_images_location_created', 'images', ['locationId', 'createdAt']),
+    ('ix_menus_location_created', 'menus', ['locationId', 'createdAt']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
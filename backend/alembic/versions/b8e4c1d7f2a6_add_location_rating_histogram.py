@@ -0,0 +1,39 @@
+"""Add location rating histogram
+
+Revision ID: b8e4c1d7f2a6
+Revises: a3d6f0c2e915
+Create Date: 2026-10-17 16:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4c1d7f2a6'
+down_revision: Union[str, None] = 'a3d6f0c2e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STARS = range(1, 6)
+
+
+def upgrade() -> None:
+    for star in STARS:
+        op.add_column('location_stats', sa.Column(f'rating{star}', sa.Integer(), server_default='0', nullable=False))
+    # Backfill from existing reviews
+    op.execute(
+        'UPDATE location_stats SET ' + ', '.join(
+            f'rating{star} = (SELECT COUNT(*) FROM reviews '
+            f'WHERE reviews."locationId" = location_stats."locationId" AND reviews.rating = {star})'
+            for star in STARS
+        )
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('location_stats') as batch_op:
+        for star in reversed(STARS):
+            batch_op.drop_column(f'rating{star}')
@@ -0,0 +1,67 @@
+"""Add locations_fts search index
+
+Revision ID: c7a2e0b94f13
+Revises: 9d3f5a81c2e4
+Create Date: 2026-10-17 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a2e0b94f13'
+down_revision: Union[str, None] = '9d3f5a81c2e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.search.LOCATION_SEARCH_DDL at this revision; migrations must not follow app changes
+LOCATION_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS locations_fts USING fts5(
+        name, address, description,
+        content='locations', content_rowid='rowid', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS locations_fts_insert AFTER INSERT ON locations BEGIN
+        INSERT INTO locations_fts(rowid, name, address, description)
+        VALUES (new.rowid, new.name, new.address, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS locations_fts_delete AFTER DELETE ON locations BEGIN
+        INSERT INTO locations_fts(locations_fts, rowid, name, address, description)
+        VALUES ('delete', old.rowid, old.name, old.address, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS locations_fts_update AFTER UPDATE OF name, address, description ON locations BEGIN
+        INSERT INTO locations_fts(locations_fts, rowid, name, address, description)
+        VALUES ('delete', old.rowid, old.name, old.address, old.description);
+        INSERT INTO locations_fts(rowid, name, address, description)
+        VALUES (new.rowid, new.name, new.address, new.description);
+    END
+    """,
+]
+
+
+def upgrade() -> None:
+    # FTS5 is SQLite only; other databases keep the LIKE fallback
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in LOCATION_SEARCH_DDL:
+        op.execute(statement)
+    op.execute("INSERT INTO locations_fts(locations_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS locations_fts_update')
+    op.execute('DROP TRIGGER IF EXISTS locations_fts_delete')
+    op.execute('DROP TRIGGER IF EXISTS locations_fts_insert')
+    op.execute('DROP TABLE IF EXISTS locations_fts')
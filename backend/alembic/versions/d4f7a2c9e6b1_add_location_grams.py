@@ -0,0 +1,86 @@
+"""Add locations_grams short keyword search index
+
+Revision ID: d4f7a2c9e6b1
+Revises: b8e4c1d7f2a6
+Create Date: 2026-10-17 17:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f7a2c9e6b1'
+down_revision: Union[str, None] = 'b8e4c1d7f2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of app.search.LOCATION_GRAMS_DDL / LOCATION_GRAMS_REBUILD at this revision
+# (MAX_GRAM_POSITION = 1024); migrations must not follow app changes
+GRAM_ROWS = (
+    "SELECT lower(substr({row}.name, pos, 2)), {row}.rowid, 0 FROM {source} WHERE pos <= length({row}.name) "
+    "UNION ALL SELECT lower(substr({row}.address, pos, 2)), {row}.rowid, 1 FROM {source} WHERE pos <= length({row}.address) "
+    "UNION ALL SELECT lower(substr({row}.description, pos, 2)), {row}.rowid, 2 FROM {source} WHERE pos <= length({row}.description)"
+)
+NEW_GRAM_ROWS = GRAM_ROWS.format(row='new', source='locations_gram_positions')
+
+LOCATION_GRAMS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS locations_grams (
+        gram TEXT NOT NULL,
+        docid INTEGER NOT NULL,
+        field INTEGER NOT NULL,
+        PRIMARY KEY (gram, docid, field)
+    ) WITHOUT ROWID
+    """,
+    'CREATE INDEX IF NOT EXISTS ix_locations_grams_docid ON locations_grams (docid)',
+    'CREATE TABLE IF NOT EXISTS locations_gram_positions (pos INTEGER PRIMARY KEY)',
+    """
+    INSERT OR IGNORE INTO locations_gram_positions (pos)
+    WITH RECURSIVE positions(pos) AS (SELECT 1 UNION ALL SELECT pos + 1 FROM positions WHERE pos < 1024)
+    SELECT pos FROM positions
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS locations_grams_insert AFTER INSERT ON locations BEGIN
+        INSERT OR IGNORE INTO locations_grams (gram, docid, field) {NEW_GRAM_ROWS};
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS locations_grams_delete AFTER DELETE ON locations BEGIN
+        DELETE FROM locations_grams WHERE docid = old.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS locations_grams_update AFTER UPDATE OF name, address, description ON locations BEGIN
+        DELETE FROM locations_grams WHERE docid = old.rowid;
+        INSERT OR IGNORE INTO locations_grams (gram, docid, field) {NEW_GRAM_ROWS};
+    END
+    """,
+]
+
+LOCATION_GRAMS_REBUILD = [
+    'DELETE FROM locations_grams',
+    'INSERT OR IGNORE INTO locations_grams (gram, docid, field) '
+    + GRAM_ROWS.format(row='l', source='locations l JOIN locations_gram_positions'),
+]
+
+
+def upgrade() -> None:
+    # SQLite only, like locations_fts; other databases keep the LIKE fallback
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in LOCATION_GRAMS_DDL + LOCATION_GRAMS_REBUILD:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS locations_grams_update')
+    op.execute('DROP TRIGGER IF EXISTS locations_grams_delete')
+    op.execute('DROP TRIGGER IF EXISTS locations_grams_insert')
+    op.execute('DROP TABLE IF EXISTS locations_gram_positions')
+    op.execute('DROP TABLE IF EXISTS locations_grams')
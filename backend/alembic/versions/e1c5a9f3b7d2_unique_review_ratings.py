@@ -0,0 +1,70 @@
+"""Make review_ratings unique per user and review
+
+Revision ID: e1c5a9f3b7d2
+Revises: d4f7a2c9e6b1
+Create Date: 2026-10-17 18:20:00.000000
+
+"""
+from math import sqrt
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1c5a9f3b7d2'
+down_revision: Union[str, None] = 'd4f7a2c9e6b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def wilsonLowerBound(upvotes: int, downvotes: int, z: float = 1.96) -> float:
+    # Frozen copy of app.services.wilsonLowerBound
+    n = upvotes + downvotes
+    if n == 0:
+        return 0.0
+    p = upvotes / n
+    return (p + z * z / (2 * n) - z * sqrt((p * (1 - p) + z * z / (4 * n)) / n)) / (1 + z * z / n)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Concurrent votes could insert the same (userId, reviewId) twice; keep the latest row of each
+    duplicated = [row[0] for row in bind.execute(sa.text(
+        'SELECT DISTINCT "reviewId" FROM review_ratings GROUP BY "userId", "reviewId" HAVING COUNT(*) > 1'
+    ))]
+    if duplicated:
+        op.execute(
+            'DELETE FROM review_ratings WHERE rowid NOT IN '
+            '(SELECT MAX(rowid) FROM review_ratings GROUP BY "userId", "reviewId")'
+        )
+        # The duplicates were counted too, recount and re-score the reviews they belonged to
+        reviewIds = sa.bindparam('reviewIds', expanding=True)
+        bind.execute(sa.text(
+            'UPDATE reviews SET '
+            'upvotes = (SELECT COUNT(*) FROM review_ratings r WHERE r."reviewId" = reviews.id AND r.rating = \'up\'), '
+            'downvotes = (SELECT COUNT(*) FROM review_ratings r WHERE r."reviewId" = reviews.id AND r.rating = \'down\') '
+            'WHERE id IN :reviewIds'
+        ).bindparams(reviewIds), {"reviewIds": duplicated})
+        rows = bind.execute(
+            sa.text('SELECT id, upvotes, downvotes FROM reviews WHERE id IN :reviewIds').bindparams(reviewIds),
+            {"reviewIds": duplicated}
+        ).fetchall()
+        if rows:
+            bind.execute(
+                sa.text('UPDATE reviews SET helpfulness = :helpfulness WHERE id = :id'),
+                [{"id": row[0], "helpfulness": wilsonLowerBound(row[1], row[2])} for row in rows]
+            )
+
+    # The unique constraint's index covers (userId, reviewId) lookups
+    op.drop_index('ix_review_ratings_user_review', table_name='review_ratings')
+    with op.batch_alter_table('review_ratings') as batch_op:
+        batch_op.create_unique_constraint('uq_review_ratings_user_review', ['userId', 'reviewId'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('review_ratings') as batch_op:
+        batch_op.drop_constraint('uq_review_ratings_user_review', type_='unique')
+    op.create_index('ix_review_ratings_user_review', 'review_ratings', ['userId', 'reviewId'], unique=False)
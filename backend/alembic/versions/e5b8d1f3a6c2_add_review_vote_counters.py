@@ -0,0 +1,37 @@
+"""Add review vote counters
+
+Revision ID: e5b8d1f3a6c2
+Revises: c7a2e0b94f13
+Create Date: 2026-10-17 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d1f3a6c2'
+down_revision: Union[str, None] = 'c7a2e0b94f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reviews', sa.Column('upvotes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('reviews', sa.Column('downvotes', sa.Integer(), server_default='0', nullable=False))
+    # Backfill from existing votes
+    op.execute(
+        'UPDATE reviews SET '
+        'upvotes = (SELECT COUNT(*) FROM review_ratings '
+        'WHERE review_ratings."reviewId" = reviews.id AND review_ratings.rating = \'up\'), '
+        'downvotes = (SELECT COUNT(*) FROM review_ratings '
+        'WHERE review_ratings."reviewId" = reviews.id AND review_ratings.rating = \'down\')'
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reviews') as batch_op:
+        batch_op.drop_column('downvotes')
+        batch_op.drop_column('upvotes')
@@ -0,0 +1,51 @@
+"""Add review helpfulness score
+
+Revision ID: f2a9c4e7b831
+Revises: e5b8d1f3a6c2
+Create Date: 2026-10-17 14:40:00.000000
+
+"""
+from math import sqrt
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c4e7b831'
+down_revision: Union[str, None] = 'e5b8d1f3a6c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def wilsonLowerBound(upvotes: int, downvotes: int, z: float = 1.96) -> float:
+    # Frozen copy of app.services.wilsonLowerBound
+    n = upvotes + downvotes
+    if n == 0:
+        return 0.0
+    p = upvotes / n
+    return (p + z * z / (2 * n) - z * sqrt((p * (1 - p) + z * z / (4 * n)) / n)) / (1 + z * z / n)
+
+
+def upgrade() -> None:
+    op.add_column('reviews', sa.Column('helpfulness', sa.Float(), server_default='0', nullable=False))
+
+    # Backfill scores for reviews that already have votes
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        'SELECT id, upvotes, downvotes FROM reviews WHERE upvotes > 0 OR downvotes > 0'
+    )).fetchall()
+    if rows:
+        bind.execute(
+            sa.text('UPDATE reviews SET helpfulness = :helpfulness WHERE id = :id'),
+            [{"id": row[0], "helpfulness": wilsonLowerBound(row[1], row[2])} for row in rows]
+        )
+
+    op.create_index('ix_reviews_location_helpfulness', 'reviews', ['locationId', 'helpfulness', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reviews_location_helpfulness', table_name='reviews')
+    with op.batch_alter_table('reviews') as batch_op:
+        batch_op.drop_column('helpfulness')
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+  """Per-provider circuit breaker with a last-known-good result cache.
+
+  The breaker opens when the error rate or slow-call rate over the last calls crosses its threshold.
+  While open, callers get the last good result for the same request; after a cool-down a single
+  background probe is allowed through and its outcome closes or re-opens the breaker.
+  """
+
+  def __init__(self, name: str):
+    self.name = name
+    self.state = CLOSED
+    self.openedAt = 0.0
+    self.outcomes: deque = deque(maxlen=settings.breakerWindowSize)
+    self.lastGood: "OrderedDict[Hashable, Any]" = OrderedDict()
+    self.probing = False
+    self.lock = threading.Lock()
+    self.stats = {"calls": 0, "failures": 0, "shortCircuited": 0, "staleServed": 0, "opened": 0}
+
+  def record(self, ok: bool, latency: float) -> None:
+    """Record a call outcome and update the breaker state"""
+    with self.lock:
+      self.stats["calls"] += 1
+      if not ok:
+        self.stats["failures"] += 1
+      self.outcomes.append((ok, latency))
+
+      if self.state == HALF_OPEN:
+        if ok:
+          self.state = CLOSED
+          self.outcomes.clear()
+          logger.info(f"{self.name} breaker closed after successful probe")
+        else:
+          self.trip()
+        return
+
+      if self.state == CLOSED and len(self.outcomes) >= settings.breakerMinCalls:
+        errorRate = sum(1 for success, _ in self.outcomes if not success) / len(self.outcomes)
+        slowRate = sum(1 for _, elapsed in self.outcomes if elapsed >= settings.breakerSlowCallSeconds) / len(self.outcomes)
+        if errorRate >= settings.breakerErrorRate or slowRate >= settings.breakerSlowCallRate:
+          self.trip()
+
+  def trip(self) -> None:
+    """Open the breaker (caller holds the lock)"""
+    if self.state != OPEN:
+      self.stats["opened"] += 1
+      logger.warning(f"{self.name} breaker opened")
+    self.state = OPEN
+    self.openedAt = time.monotonic()
+
+  def allowRequest(self) -> bool:
+    """Whether a call may go through, counting it as short-circuited if not"""
+    with self.lock:
+      if self.state == CLOSED:
+        return True
+      self.stats["shortCircuited"] += 1
+      return False
+
+  def claimProbe(self) -> bool:
+    """Whether the caller should run the single recovery probe"""
+    with self.lock:
+      if self.state != OPEN or self.probing:
+        return False
+      if time.monotonic() - self.openedAt < settings.breakerOpenSeconds:
+        return False
+      self.state = HALF_OPEN
+      self.probing = True
+      return True
+
+  def finishProbe(self) -> None:
+    """Release the probe claim; a probe that ended without recording an outcome re-opens the breaker"""
+    with self.lock:
+      self.probing = False
+      if self.state == HALF_OPEN:
+        self.trip()
+
+  def remember(self, key: Hashable, result: Any) -> None:
+    with self.lock:
+      self.lastGood[key] = result
+      self.lastGood.move_to_end(key)
+      while len(self.lastGood) > settings.breakerStaleCacheSize:
+        self.lastGood.popitem(last=False)
+
+  def stale(self, key: Hashable) -> Optional[Any]:
+    with self.lock:
+      result = self.lastGood.get(key)
+      if result is not None:
+        self.stats["staleServed"] += 1
+      return result
+
+  def getState(self) -> dict:
+    with self.lock:
+      window = len(self.outcomes)
+      return {
+        "state": self.state,
+        "errorRate": round(sum(1 for ok, _ in self.outcomes if not ok) / window, 3) if window else 0.0,
+        "avgLatency": round(sum(elapsed for _, elapsed in self.outcomes) / window, 3) if window else 0.0,
+        "openForSeconds": round(time.monotonic() - self.openedAt, 1) if self.state != CLOSED else 0.0,
+        **self.stats
+      }
+
+# Background probe tasks, referenced so they aren't garbage collected mid-flight
+probeTasks = set()
+
+async def callWithBreaker(
+  breaker: CircuitBreaker,
+  key: Hashable,
+  call: Callable[[], Any],
+  runCall: Callable[[Any], Any]
+) -> Optional[Any]:
+  """Run a provider call through its breaker.
+
+  call() creates the provider coroutine; runCall(coro) awaits it and returns None on failure.
+  Falls back to the last good result for key whenever the call is skipped or fails.
+  """
+  if breaker.allowRequest():
+    started = time.monotonic()
+    result = await runCall(call())
+    breaker.record(result is not None, time.monotonic() - started)
+    if result is not None:
+      breaker.remember(key, result)
+      return result
+    return breaker.stale(key)
+
+  if breaker.claimProbe():
+    async def probe():
+      started = time.monotonic()
+      try:
+        result = await runCall(call())
+        breaker.record(result is not None, time.monotonic() - started)
+        if result is not None:
+          breaker.remember(key, result)
+      finally:
+        breaker.finishProbe()
+
+    task = asyncio.create_task(probe())
+    probeTasks.add(task)
+    task.add_done_callback(probeTasks.discard)
+
+  return breaker.stale(key)
+
+breakers: Dict[str, CircuitBreaker] = {
+  "Kakao API": CircuitBreaker("Kakao API"),
+  "Tour API": CircuitBreaker("Tour API"),
+}
+
+def getBreakerStates() -> Dict[str, dict]:
+  return {name: breaker.getState() for name, breaker in breakers.items()}
@@ -0,0 +1,132 @@
+import csv
+import json
+import logging
+import time
+import uuid
+from itertools import islice
+from typing import Any, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Location
+from .schemas import LocationCreate
+from .search import deferredLocationSearchIndex
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "jsonl")
+# Rejected rows listed individually in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+class ImportAborted(Exception):
+  """An import that failed part way; the chunks committed before the failure stay in the database"""
+
+  def __init__(self, inserted: int, cause: Exception):
+    super().__init__(f"{cause} ({inserted} locations imported before the failure)")
+    self.inserted = inserted
+    self.cause = cause
+
+def detectFormat(filename: Optional[str]) -> Optional[str]:
+  """Guess the import format from a file name"""
+  if not filename:
+    return None
+  extension = filename.rsplit(".", 1)[-1].lower()
+  if extension in ("jsonl", "ndjson"):
+    return "jsonl"
+  return "csv" if extension == "csv" else None
+
+def readRows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+  """Yield (line number, raw row) from a CSV (with header) or JSONL stream; unparseable lines yield the error"""
+  if fmt == "csv":
+    reader = csv.DictReader(stream)
+    for row in reader:
+      yield reader.line_num, {key: value or None for key, value in row.items() if key}
+    return
+
+  for lineNumber, line in enumerate(stream, 1):
+    if not line.strip():
+      continue
+    try:
+      yield lineNumber, json.loads(line)
+    except ValueError as e:
+      yield lineNumber, e
+
+def parseRow(raw: Any) -> LocationCreate:
+  """Validate one raw row, accepting flat lat/lng columns or LocationCreate's nested coordinates"""
+  if isinstance(raw, Exception):
+    raise ValueError(f"invalid JSON: {raw}")
+  if not isinstance(raw, dict):
+    raise ValueError("row is not an object")
+  if "coordinates" not in raw:
+    raw = {**raw, "coordinates": {"lat": raw.get("lat"), "lng": raw.get("lng")}}
+  location = LocationCreate.model_validate(raw)
+  if not (-90 <= location.coordinates.lat <= 90 and -180 <= location.coordinates.lng <= 180):
+    raise ValueError("coordinates out of range")
+  return location
+
+def describeError(error: Exception) -> str:
+  if isinstance(error, ValidationError):
+    return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors())
+  return str(error)
+
+def importLocations(db: Session, stream: TextIO, fmt: str, batchSize: Optional[int] = None) -> dict:
+  """Stream locations from CSV/JSONL into the database.
+
+  Rows are validated a chunk at a time and each chunk's valid rows are inserted with one executemany
+  in its own transaction, so a bad row only rejects itself and memory stays bounded by the chunk.
+  The search index is rebuilt once at the end; callers refresh any in-process indexes.
+
+  Raises ImportAborted, with the number of rows already committed, if reading or inserting fails.
+  """
+  batchSize = batchSize or settings.importBatchSize
+  insert = Location.__table__.insert()
+  inserted = 0
+  rejected = 0
+  errors: List[dict] = []
+  started = time.perf_counter()
+
+  try:
+    with deferredLocationSearchIndex(db):
+      rows = readRows(stream, fmt)
+      while True:
+        chunk = list(islice(rows, batchSize))
+        if not chunk:
+          break
+
+        mappings = []
+        for lineNumber, raw in chunk:
+          try:
+            location = parseRow(raw)
+          except (ValidationError, ValueError) as e:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+              errors.append({"line": lineNumber, "error": describeError(e)})
+            continue
+          mappings.append({
+            "id": str(uuid.uuid4()),
+            "name": location.name,
+            "location_type": location.location_type,
+            "latitude": location.coordinates.lat,
+            "longitude": location.coordinates.lng,
+            "address": location.address,
+            "description": location.description
+          })
+
+        if mappings:
+          db.execute(insert, mappings)
+          db.commit()
+          inserted += len(mappings)
+  except Exception as e:
+    raise ImportAborted(inserted, e) from e
+
+  elapsed = time.perf_counter() - started
+  logger.info(f"Imported {inserted} locations ({rejected} rejected) in {elapsed:.2f}s")
+  return {
+    "inserted": inserted,
+    "rejected": rejected,
+    "errors": errors,
+    "elapsed_seconds": round(elapsed, 3),
+    "rows_per_second": round(inserted / elapsed, 1) if elapsed > 0 else 0.0
+  }
@@ -0,0 +1,81 @@
+"""Maintenance commands, run from the backend directory:
+
+  python -m app.cli rebuild-location-stats
+  python -m app.cli import-locations seoul.csv
+  python -m app.cli reconcile-review-votes
+"""
+import argparse
+import logging
+import sys
+
+from .database import engine, Base, SessionLocal
+from .services import LocationStatsService, ReviewService
+from .bulkimport import IMPORT_FORMATS, detectFormat, importLocations
+
+logger = logging.getLogger(__name__)
+
+def rebuildLocationStats(args: argparse.Namespace) -> None:
+  """Backfill location_stats from the reviews table"""
+  db = SessionLocal()
+  try:
+    count = LocationStatsService.rebuild(db)
+    print(f"Rebuilt location_stats for {count} locations")
+  finally:
+    db.close()
+
+def reconcileReviewVotes(args: argparse.Namespace) -> None:
+  """Recount reviews.upvotes/downvotes from review_ratings and re-score helpfulness"""
+  db = SessionLocal()
+  try:
+    fixed, rescored = ReviewService.reconcileVoteCounts(db)
+    print(f"Reconciled vote counters on {fixed} reviews, re-scored helpfulness on {rescored}")
+  finally:
+    db.close()
+
+def importLocationsFile(args: argparse.Namespace) -> None:
+  """Bulk import locations from a CSV or JSONL file ('-' for stdin)"""
+  fmt = args.format or detectFormat(args.path)
+  if fmt not in IMPORT_FORMATS:
+    sys.exit("Unknown import format, pass --format csv or --format jsonl")
+
+  db = SessionLocal()
+  try:
+    if args.path == "-":
+      sys.stdin.reconfigure(encoding="utf-8-sig", newline="")
+      report = importLocations(db, sys.stdin, fmt, args.batch_size)
+    else:
+      with open(args.path, encoding="utf-8-sig", newline="") as stream:
+        report = importLocations(db, stream, fmt, args.batch_size)
+  finally:
+    db.close()
+
+  for error in report["errors"]:
+    print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+  print(
+    f"Imported {report['inserted']} locations, rejected {report['rejected']}, "
+    f"{report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)"
+  )
+
+def main() -> None:
+  logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+  parser = argparse.ArgumentParser(prog="python -m app.cli", description="Bapful maintenance commands")
+  subparsers = parser.add_subparsers(dest="command", required=True)
+
+  rebuildStats = subparsers.add_parser("rebuild-location-stats", help="Backfill location_stats from reviews")
+  rebuildStats.set_defaults(handler=rebuildLocationStats)
+
+  reconcileVotes = subparsers.add_parser("reconcile-review-votes", help="Recount review vote counters from review_ratings")
+  reconcileVotes.set_defaults(handler=reconcileReviewVotes)
+
+  importCommand = subparsers.add_parser("import-locations", help="Bulk import locations from CSV or JSONL")
+  importCommand.add_argument("path", help="CSV (with header: name,location_type,lat,lng,address,description) or JSONL file, '-' for stdin")
+  importCommand.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+  importCommand.add_argument("--batch-size", type=int, help="rows per transaction (default: importBatchSize setting)")
+  importCommand.set_defaults(handler=importLocationsFile)
+
+  args = parser.parse_args()
+  Base.metadata.create_all(bind=engine)
+  args.handler(args)
+
+if __name__ == "__main__":
+  main()
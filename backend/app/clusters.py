@@ -0,0 +1,160 @@
+import threading
+from math import floor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Location, LocationStats
+
+# (rating, id) of a cell's best member; ties go to the larger id so the choice is stable
+TopMember = Tuple[float, str]
+
+class ClusterCell:
+  """Aggregate of every location inside one grid cell at one zoom level"""
+
+  __slots__ = ("count", "sumLat", "sumLng", "top")
+
+  def __init__(self):
+    self.count = 0
+    self.sumLat = 0.0
+    self.sumLng = 0.0
+    self.top: Optional[TopMember] = None
+
+class ClusterIndex:
+  """Hierarchical grid of marker clusters, one level per map zoom.
+
+  A level-z cell is a quarter of a 256px web map tile's width at zoom z (in degrees), so each
+  cell splits exactly into four cells at z + 1. The finest level keeps its members; coarser
+  levels only keep aggregates, and a cell's top-rated member is recomputed from its four
+  children when the current top leaves. Adding, moving or re-rating a location touches one
+  cell per level.
+  """
+
+  def __init__(self, minZoom: int, maxZoom: int, cellsPerTile: int):
+    self.minZoom = minZoom
+    self.maxZoom = maxZoom
+    self.cellsPerTile = cellsPerTile
+    self.levels: Dict[int, Dict[Tuple[int, int], ClusterCell]] = {z: {} for z in range(minZoom, maxZoom + 1)}
+    # Members of the finest level's cells: id -> (lat, lng, rating)
+    self.members: Dict[Tuple[int, int], Dict[str, Tuple[float, float, float]]] = {}
+    self.positions: Dict[str, Tuple[float, float, float]] = {}
+    self.lock = threading.RLock()
+
+  def cellSize(self, zoom: int) -> float:
+    return 360.0 / (2 ** zoom * self.cellsPerTile)
+
+  def cellFor(self, zoom: int, lat: float, lng: float) -> Tuple[int, int]:
+    size = self.cellSize(zoom)
+    return floor(lat / size), floor(lng / size)
+
+  def add(self, locationId: str, lat: float, lng: float, rating: float = 0.0) -> None:
+    """Insert, move or re-rate a location"""
+    with self.lock:
+      self.remove(locationId)
+      self.positions[locationId] = (lat, lng, rating)
+      self.members.setdefault(self.cellFor(self.maxZoom, lat, lng), {})[locationId] = (lat, lng, rating)
+      member = (rating, locationId)
+      for zoom in range(self.minZoom, self.maxZoom + 1):
+        cell = self.levels[zoom].setdefault(self.cellFor(zoom, lat, lng), ClusterCell())
+        cell.count += 1
+        cell.sumLat += lat
+        cell.sumLng += lng
+        if cell.top is None or member > cell.top:
+          cell.top = member
+
+  def remove(self, locationId: str) -> None:
+    """Remove a location"""
+    with self.lock:
+      position = self.positions.pop(locationId, None)
+      if position is None:
+        return
+      lat, lng, _ = position
+      finest = self.cellFor(self.maxZoom, lat, lng)
+      members = self.members[finest]
+      del members[locationId]
+      if not members:
+        del self.members[finest]
+
+      # Finest first, so coarser levels can recompute their top from already updated children
+      for zoom in range(self.maxZoom, self.minZoom - 1, -1):
+        key = self.cellFor(zoom, lat, lng)
+        cell = self.levels[zoom][key]
+        cell.count -= 1
+        if not cell.count:
+          del self.levels[zoom][key]
+          continue
+        cell.sumLat -= lat
+        cell.sumLng -= lng
+        if cell.top is not None and cell.top[1] == locationId:
+          cell.top = self.recomputeTop(zoom, key)
+
+  def recomputeTop(self, zoom: int, key: Tuple[int, int]) -> Optional[TopMember]:
+    if zoom == self.maxZoom:
+      return max(((rating, locationId) for locationId, (_, _, rating) in self.members.get(key, {}).items()), default=None)
+    i, j = key
+    children = self.levels[zoom + 1]
+    tops = (
+      children[child].top
+      for child in ((2 * i, 2 * j), (2 * i + 1, 2 * j), (2 * i, 2 * j + 1), (2 * i + 1, 2 * j + 1))
+      if child in children and children[child].top is not None
+    )
+    return max(tops, default=None)
+
+  def updateRating(self, locationId: str, rating: float) -> None:
+    """Re-rate an indexed location (no-op for unknown ids)"""
+    with self.lock:
+      position = self.positions.get(locationId)
+      if position is not None and position[2] != rating:
+        self.add(locationId, position[0], position[1], rating)
+
+  def rebuild(self, rows: Iterable[Tuple[str, float, float, Optional[float]]]) -> None:
+    """Replace the index contents with (id, lat, lng, rating) rows"""
+    # Build aside and swap, so readers only wait for the swap and not the whole build
+    fresh = ClusterIndex(self.minZoom, self.maxZoom, self.cellsPerTile)
+    for locationId, lat, lng, rating in rows:
+      fresh.add(locationId, lat, lng, rating or 0.0)
+    with self.lock:
+      self.levels = fresh.levels
+      self.members = fresh.members
+      self.positions = fresh.positions
+
+  def rebuildFromDatabase(self, db: Session) -> int:
+    """Load every location's coordinates and average rating from the database"""
+    rows = db.query(Location.id, Location.latitude, Location.longitude, LocationStats.avgRating).outerjoin(
+      LocationStats, LocationStats.locationId == Location.id
+    ).all()
+    self.rebuild(rows)
+    return len(rows)
+
+  def clusters(
+    self,
+    south: float,
+    north: float,
+    west: float,
+    east: float,
+    zoom: int
+  ) -> List[Tuple[int, float, float, Optional[TopMember]]]:
+    """Get (count, centroidLat, centroidLng, top) for every non-empty cell in a viewport"""
+    zoom = min(max(zoom, self.minZoom), self.maxZoom)
+    minLat, minLng = self.cellFor(zoom, south, west)
+    maxLat, maxLng = self.cellFor(zoom, north, east)
+    with self.lock:
+      level = self.levels[zoom]
+      if (maxLat - minLat + 1) * (maxLng - minLng + 1) <= len(level):
+        keys = (
+          (i, j) for i in range(minLat, maxLat + 1) for j in range(minLng, maxLng + 1)
+          if (i, j) in level
+        )
+      else:
+        # Viewport spans more cells than are occupied, scan the occupied ones instead
+        keys = (key for key in level if minLat <= key[0] <= maxLat and minLng <= key[1] <= maxLng)
+      return [
+        (cell.count, cell.sumLat / cell.count, cell.sumLng / cell.count, cell.top)
+        for cell in (level[key] for key in keys)
+      ]
+
+  def __len__(self) -> int:
+    return len(self.positions)
+
+clusterIndex = ClusterIndex(settings.clusterMinZoom, settings.clusterMaxZoom, settings.clusterCellsPerTile)
@@ -17,13 +17,92 @@ class Settings(BaseSettings):
     jwtAlgorithm: str = "HS256"
     jwtExpirationMinutes: int = 20
 
+    # External provider endpoints (override to point at bench/fakeproviders.py for load tests)
+    kakaoAPIUrl: str = "https://dapi.kakao.com/v2/local/search/keyword.json"
+    kakaoRegionAPIUrl: str = "https://dapi.kakao.com/v2/local/geo/coord2regioncode.json"
+    tourAPIUrl: str = "http://apis.data.go.kr/B551011/TarRlteTarService1/areaBasedList1"
+    tourAPIAreaCodeUrl: str = "https://apis.data.go.kr/B551011/KorService2/ldongCode2"
+
     # Tour API
     tourapiKey: str = ""
     tourapiMandatoryKey: str = ""
+    # Area/sigungu code table cache and refresh interval; defaults used when a coordinate can't be resolved
+    tourapiAreaCodeCachePath: str = "tourapi_area_codes.json"
+    tourapiAreaCodeRefreshHours: int = 24 * 7
+    tourapiDefaultAreaCode: str = "51"
+    tourapiDefaultSigunguCode: str = "51130"
 
     # Kakao Map API
     kakaomap_restapi_key: str = ""
 
+    # External providers: HTTP timeout per request and overall deadline per provider (seconds)
+    kakaoTimeoutSeconds: float = 2.0
+    kakaoDeadlineSeconds: float = 2.5
+    tourapiTimeoutSeconds: float = 3.0
+    tourapiDeadlineSeconds: float = 4.0
+    # Pooled provider clients (one keep-alive pool per provider)
+    providerMaxConnections: int = 20
+    providerMaxKeepalive: int = 10
+    providerKeepaliveExpiry: float = 30.0
+    providerHttp2: bool = True  # used only when the h2 package is installed
+    providerRetries: int = 2
+    providerRetryBaseDelay: float = 0.1
+
+    # Circuit breakers for external providers (rolling window of recent calls)
+    breakerWindowSize: int = 20
+    breakerMinCalls: int = 5
+    breakerErrorRate: float = 0.5
+    breakerSlowCallSeconds: float = 2.0
+    breakerSlowCallRate: float = 0.8
+    breakerOpenSeconds: float = 30.0
+    breakerStaleCacheSize: int = 1024  # last-known-good results kept per provider
+
+    # Geocode cache for Kakao keyword lookups
+    geocodeCacheSize: int = 4096
+    geocodeTtlSeconds: int = 30 * 24 * 3600
+    geocodeNegativeTtlSeconds: int = 24 * 3600
+    geocodeConcurrency: int = 8  # max in-flight Kakao lookups per TourAPI request
+
+    # Geo
+    # Radii (meters) at or below this use the equirectangular distance fast path; 0 disables it
+    approximateDistanceMaxRadius: int = 0
+    nearestMaxRadius: int = 20000  # k-nearest queries never look further than this (meters)
+
+    # Marker clusters (one grid level per web map zoom, cellsPerTile cells across a 256px tile)
+    clusterMinZoom: int = 5
+    clusterMaxZoom: int = 18
+    clusterCellsPerTile: int = 4
+
+    # Nearby response cache
+    nearbyCacheEnabled: bool = True
+    nearbyCacheTileDeg: float = 0.002  # ~220m tiles
+    nearbyCacheMaxBytes: int = 32 * 1024 * 1024
+    nearbyCacheDbTtlSeconds: int = 300  # safety net; DB hits are invalidated on writes
+    nearbyCacheProviderTtlSeconds: int = 60
+
+    # Location detail response
+    detailImageLimit: int = 10
+    detailMenuLimit: int = 5
+    detailReviewLimit: int = 5
+
+    # Write-behind review votes (rateReview); disable to write every vote synchronously
+    voteBufferEnabled: bool = True
+    voteFlushIntervalMs: int = 250
+
+    # Recommendation snapshots (popular / top_rated / new), rebuilt in the background
+    recommendationRefreshSeconds: int = 60
+    recommendationSnapshotSize: int = 50  # items kept per section, the largest per_category allowed
+
+    # Bulk location import
+    importBatchSize: int = 1000  # rows validated and inserted per transaction
+
+    # Merging duplicate places across DB / Kakao / TourAPI
+    mergeDistanceMeters: float = 50.0
+    mergeNameSimilarity: float = 0.6  # bigram Dice coefficient
+
+    # Search
+    searchResultLimit: int = 20
+
     # File Storage
     uploadsDir: str = "uploads"
     maxFileSize: int = 10 * 1024 * 1024  # 10MB
@@ -0,0 +1,20 @@
+import base64
+import binascii
+import json
+from typing import Any, Tuple
+
+def encodeCursor(*values: Any) -> str:
+  """Encode a keyset position (the sort key of the last row sent) as an opaque cursor"""
+  raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+  return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decodeCursor(cursor: str, size: int) -> Tuple[Any, ...]:
+  """Decode a cursor made by encodeCursor with size values, raising ValueError if it is malformed"""
+  try:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    values = json.loads(raw.decode("utf-8"))
+  except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+    raise ValueError("Malformed cursor") from e
+  if not isinstance(values, list) or len(values) != size:
+    raise ValueError("Malformed cursor")
+  return tuple(values)
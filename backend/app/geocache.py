@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from .config import settings
+from .database import SessionLocal
+from .models import GeocodeEntry
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float, str]
+
+# Sentinel for "not cached" so a cached negative result (None) can be told apart
+MISS = object()
+
+def normalizeQuery(query: str) -> str:
+  """Normalize a geocode query so trivially different spellings share a cache key"""
+  return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+class GeocodeCache:
+  """Two-tier geocode cache: in-memory LRU in front of the geocode_cache table.
+
+  None values are negative entries ("No location found") and use a shorter TTL.
+  """
+
+  def __init__(self, maxSize: int):
+    self.maxSize = maxSize
+    self.entries: "OrderedDict[str, Tuple[Optional[Coordinates], datetime]]" = OrderedDict()
+    self.lock = threading.Lock()
+    self.stats = {"memoryHits": 0, "dbHits": 0, "misses": 0}
+
+  def ttlFor(self, value: Optional[Coordinates]) -> timedelta:
+    seconds = settings.geocodeTtlSeconds if value is not None else settings.geocodeNegativeTtlSeconds
+    return timedelta(seconds=seconds)
+
+  def getMemory(self, key: str):
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        return MISS
+      value, expiresAt = entry
+      if expiresAt <= datetime.utcnow():
+        del self.entries[key]
+        return MISS
+      self.entries.move_to_end(key)
+      return value
+
+  def putMemory(self, key: str, value: Optional[Coordinates], expiresAt: datetime) -> None:
+    with self.lock:
+      self.entries[key] = (value, expiresAt)
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.maxSize:
+        self.entries.popitem(last=False)
+
+  def getDatabase(self, key: str):
+    db = SessionLocal()
+    try:
+      entry = db.query(GeocodeEntry).filter(GeocodeEntry.query == key).first()
+    except Exception as e:
+      logger.warning(f"Failed to read geocode cache entry '{key}': {e}")
+      return MISS, None
+    finally:
+      db.close()
+    if entry is None or entry.expiresAt <= datetime.utcnow():
+      return MISS, None
+    value = (entry.latitude, entry.longitude, entry.address) if entry.found else None
+    return value, entry.expiresAt
+
+  def putDatabase(self, key: str, value: Optional[Coordinates], expiresAt: datetime) -> None:
+    db = SessionLocal()
+    try:
+      db.merge(GeocodeEntry(
+        query=key,
+        found=value is not None,
+        latitude=value[0] if value else None,
+        longitude=value[1] if value else None,
+        address=value[2] if value else None,
+        expiresAt=expiresAt
+      ))
+      db.commit()
+    except Exception as e:
+      db.rollback()
+      logger.warning(f"Failed to persist geocode cache entry '{key}': {e}")
+    finally:
+      db.close()
+
+  async def get(self, query: str):
+    """Get cached coordinates, None for a cached negative, or MISS"""
+    key = normalizeQuery(query)
+    value = self.getMemory(key)
+    if value is not MISS:
+      self.stats["memoryHits"] += 1
+      return value
+
+    value, expiresAt = await asyncio.to_thread(self.getDatabase, key)
+    if value is not MISS:
+      self.stats["dbHits"] += 1
+      self.putMemory(key, value, expiresAt)
+      return value
+
+    self.stats["misses"] += 1
+    return MISS
+
+  async def put(self, query: str, value: Optional[Coordinates]) -> None:
+    """Cache coordinates, or None for "No location found" """
+    key = normalizeQuery(query)
+    expiresAt = datetime.utcnow() + self.ttlFor(value)
+    self.putMemory(key, value, expiresAt)
+    await asyncio.to_thread(self.putDatabase, key, value, expiresAt)
+
+  def getStats(self) -> dict:
+    return {**self.stats, "memoryEntries": len(self.entries)}
+
+geocodeCache = GeocodeCache(maxSize=settings.geocodeCacheSize)
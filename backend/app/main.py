@@ -9,10 +9,21 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from .config import settings
-from .database import engine, Base, getDatabaseSession
+from .database import engine, Base, getDatabaseSession, SessionLocal
 from .models import Location, Review, User
 from .auth import getPasswordHash
 from .routes import auth, locations, menus, heatmap, recommendations, chat
+from .spatial import locationIndex
+from .clusters import clusterIndex
+from .providers import startProviderClients, closeProviderClients, getProviderStats
+from .geocache import geocodeCache
+from .tourareas import tourAreaCodes
+from .nearbycache import nearbyCache
+from .search import ensureLocationSearchIndex
+from .breaker import getBreakerStates
+from .votebuffer import voteBuffer
+from .recsnapshot import recommendationSnapshots
+from .services import ReviewService, RecommendationService
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +39,12 @@ try:
 except Exception as e:
   logger.error(f"Failed to create database tables: {e}")
 
+try:
+  if ensureLocationSearchIndex(engine):
+    logger.info("Location search index ready")
+except Exception as e:
+  logger.error(f"Failed to create location search index: {e}")
+
 # React build directory path
 REACT_BUILD_DIR = Path(__file__).parent.parent.parent / "frontend-web" / "build"
 
@@ -47,6 +64,53 @@ app.add_middleware(
   allow_headers=["*"],
 )
 
+# Build in-process indexes
+@app.on_event("startup")
+async def buildIndexes():
+  db = SessionLocal()
+  try:
+    count = locationIndex.rebuildFromDatabase(db)
+    logger.info(f"Location grid index built with {count} locations")
+  except Exception as e:
+    logger.error(f"Failed to build location grid index: {e}")
+  try:
+    count = clusterIndex.rebuildFromDatabase(db)
+    logger.info(f"Marker cluster index built with {count} locations")
+  except Exception as e:
+    logger.error(f"Failed to build marker cluster index: {e}")
+  finally:
+    db.close()
+
+# Pooled HTTP clients for external place providers
+@app.on_event("startup")
+async def startProviders():
+  startProviderClients()
+  tourAreaCodes.start()
+
+@app.on_event("shutdown")
+async def closeProviders():
+  await tourAreaCodes.stop()
+  await closeProviderClients()
+
+# Write-behind review votes, flushed periodically and on shutdown
+@app.on_event("startup")
+async def startVoteBuffer():
+  if settings.voteBufferEnabled:
+    voteBuffer.start(ReviewService.applyVotes)
+
+@app.on_event("shutdown")
+async def flushVoteBuffer():
+  await voteBuffer.stop()
+
+# Recommendation sections precomputed off the request path
+@app.on_event("startup")
+async def startRecommendationSnapshots():
+  recommendationSnapshots.start(RecommendationService.buildSections)
+
+@app.on_event("shutdown")
+async def stopRecommendationSnapshots():
+  await recommendationSnapshots.stop()
+
 # Include routers with /api prefix
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(locations.router, prefix="/api/locations", tags=["locations"])
@@ -96,6 +160,19 @@ async def healthCheck():
   """Health check endpoint"""
   return {"status": "healthy", "app": settings.appName, "version": settings.appVersion}
 
+# Metrics endpoint
+@app.get("/api/metrics")
+async def metrics():
+  """Runtime metrics for monitoring"""
+  return {
+    "providers": getProviderStats(),
+    "breakers": getBreakerStates(),
+    "geocodeCache": geocodeCache.getStats(),
+    "nearbyCache": nearbyCache.getStats(),
+    "voteBuffer": voteBuffer.getStats(),
+    "recommendationSnapshot": recommendationSnapshots.getStats()
+  }
+
 # API root endpoint
 @app.get("/api")
 async def apiRoot():
@@ -0,0 +1,108 @@
+import re
+import unicodedata
+from math import cos, radians, floor, hypot
+from typing import Dict, List, Optional, Set, Tuple
+
+from .config import settings
+from .spatial import METERS_PER_DEGREE
+
+# Punctuation and spacing that differ between providers for the same place
+NAME_NOISE = re.compile(r"[\s\-_·.,()\[\]'\"&]+")
+
+def normalizeName(name: str) -> str:
+  """Normalize a place name for matching across providers"""
+  words = unicodedata.normalize("NFKC", name or "").lower().split()
+  # Drop a trailing branch word ("본점", "강남역점") but never the whole name
+  if len(words) > 1 and words[-1].endswith("점"):
+    words = words[:-1]
+  return NAME_NOISE.sub("", "".join(words))
+
+def bigrams(name: str) -> Set[str]:
+  return {name[i:i + 2] for i in range(len(name) - 1)} or {name}
+
+def namesMatch(a: str, aGrams: Set[str], b: str, bGrams: Set[str]) -> bool:
+  """Same place name: equal, one contains the other, or high bigram Dice similarity"""
+  if a == b:
+    return True
+  if min(len(a), len(b)) >= 2 and (a in b or b in a):
+    return True
+  return 2 * len(aGrams & bGrams) / (len(aGrams) + len(bGrams)) >= settings.mergeNameSimilarity
+
+def distanceMeters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+  """Equirectangular distance, accurate to well under a metre at merge distances"""
+  x = radians(lng2 - lng1) * cos(radians((lat1 + lat2) / 2))
+  y = radians(lat2 - lat1)
+  return 6371000 * hypot(x, y)
+
+def toRecord(item) -> dict:
+  record = dict(item) if isinstance(item, dict) else item.model_dump()
+  record["coordinates"] = dict(record["coordinates"])
+  record["provider_ids"] = dict(record.get("provider_ids") or {})
+  return record
+
+def fold(target: dict, record: dict) -> None:
+  """Fold a duplicate into an existing record; fields already set (ours first) win"""
+  for providerName, providerId in record["provider_ids"].items():
+    target["provider_ids"].setdefault(providerName, providerId)
+  for field in ("address", "description", "avg_rating", "review_count", "rating_histogram"):
+    if target.get(field) is None and record.get(field) is not None:
+      target[field] = record[field]
+
+class LocationMerger:
+  """Incrementally collapse the same place reported by several sources into one record.
+
+  Records are added in priority order (our DB first), so our rating aggregates are kept on merge.
+  Candidates are bucketed on a spatial hash and only compared within neighbouring cells, so
+  merging is linear in the number of candidates for bounded local density.
+  """
+
+  def __init__(self):
+    self.maxDistance = settings.mergeDistanceMeters
+    # Cells at least maxDistance wide in both directions up to ~60 degrees latitude
+    self.cellDeg = self.maxDistance / (METERS_PER_DEGREE * 0.5)
+    self.merged: List[dict] = []
+    self.names: List[Tuple[str, Set[str]]] = []
+    self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+  def add(self, item) -> Optional[dict]:
+    """Add a record, returning it if it is a new place or None if it was folded into an earlier one"""
+    record = toRecord(item)
+    lat, lng = record["coordinates"]["lat"], record["coordinates"]["lng"]
+    name = normalizeName(record["name"])
+    grams = bigrams(name)
+    cellLat, cellLng = floor(lat / self.cellDeg), floor(lng / self.cellDeg)
+
+    neighbours = (
+      index
+      for i in (cellLat - 1, cellLat, cellLat + 1)
+      for j in (cellLng - 1, cellLng, cellLng + 1)
+      for index in self.cells.get((i, j), ())
+    )
+    # Only merge across sources; two rows from the same source are distinct places
+    match = next((
+      index for index in neighbours
+      if not record["provider_ids"].keys() & self.merged[index]["provider_ids"].keys()
+      and distanceMeters(lat, lng, self.merged[index]["coordinates"]["lat"], self.merged[index]["coordinates"]["lng"]) <= self.maxDistance
+      and namesMatch(name, grams, *self.names[index])
+    ), None)
+
+    if match is not None:
+      fold(self.merged[match], record)
+      return None
+
+    self.cells.setdefault((cellLat, cellLng), []).append(len(self.merged))
+    self.merged.append(record)
+    self.names.append((name, grams))
+    return record
+
+  def addAll(self, items) -> List[dict]:
+    """Add records, returning the ones that are new places"""
+    added = (self.add(item) for item in items)
+    return [record for record in added if record is not None]
+
+def mergeLocations(*groups) -> List[dict]:
+  """Merge groups of records given in priority order (see LocationMerger)"""
+  merger = LocationMerger()
+  for group in groups:
+    merger.addAll(group)
+  return merger.merged
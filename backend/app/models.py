@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Boolean, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -40,6 +40,29 @@ class Location(Base):
   images = relationship("Image", back_populates="location")
   reviews = relationship("Review", back_populates="location")
   menus = relationship("Menu", back_populates="location")
+  stats = relationship("LocationStats", back_populates="location", uselist=False)
+
+class LocationStats(Base):
+  __tablename__ = "location_stats"
+
+  # Rating aggregates maintained incrementally by ReviewService.createReview
+  locationId = Column(String, ForeignKey("locations.id"), primary_key=True)
+  avgRating = Column(Float, nullable=False, default=0.0)
+  reviewCount = Column(Integer, nullable=False, default=0)
+  ratingSum = Column(Integer, nullable=False, default=0)
+  # Star histogram: how many reviews gave 1..5 stars
+  rating1 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating2 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating3 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating4 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating5 = Column(Integer, nullable=False, default=0, server_default="0")
+  updatedAt = Column(DateTime, default=func.now(), onupdate=func.now())
+
+  location = relationship("Location", back_populates="stats")
+
+  @property
+  def histogram(self) -> list:
+    return [self.rating1, self.rating2, self.rating3, self.rating4, self.rating5]
 
 class Image(Base):
   __tablename__ = "images"
@@ -51,6 +74,10 @@ class Image(Base):
 
   location = relationship("Location", back_populates="images")
 
+  __table_args__ = (
+    Index("ix_images_location_created", "locationId", "createdAt"),
+  )
+
 class Review(Base):
   __tablename__ = "reviews"
 
@@ -59,6 +86,11 @@ class Review(Base):
   locationId = Column(String, ForeignKey("locations.id"), nullable=False)
   rating = Column(Integer, nullable=False)  # 1-5
   comment = Column(Text)
+  # Vote counters maintained by ReviewService.rateReview (reconcile with `python -m app.cli reconcile-review-votes`)
+  upvotes = Column(Integer, nullable=False, default=0, server_default="0")
+  downvotes = Column(Integer, nullable=False, default=0, server_default="0")
+  # Wilson score lower bound of upvotes/downvotes, the review feed's sort key
+  helpfulness = Column(Float, nullable=False, default=0.0, server_default="0")
   createdAt = Column(DateTime, default=func.now())
   updatedAt = Column(DateTime, default=func.now(), onupdate=func.now())
 
@@ -67,6 +99,11 @@ class Review(Base):
   location = relationship("Location", back_populates="reviews")
   ratings = relationship("ReviewRating", back_populates="review")
 
+  __table_args__ = (
+    # Serves the helpfulness-ordered keyset feed in getLocationReviews
+    Index("ix_reviews_location_helpfulness", "locationId", "helpfulness", "id"),
+  )
+
 class ReviewRating(Base):
   __tablename__ = "review_ratings"
 
@@ -80,6 +117,13 @@ class ReviewRating(Base):
   user = relationship("User", back_populates="reviewRatings")
   review = relationship("Review", back_populates="ratings")
 
+  __table_args__ = (
+    # Vote counts per review (reconcile-review-votes)
+    Index("ix_review_ratings_review_rating", "reviewId", "rating"),
+    # One vote per user and review; its index also serves a user's vote lookup (rateReview)
+    UniqueConstraint("userId", "reviewId", name="uq_review_ratings_user_review"),
+  )
+
 class Menu(Base):
   __tablename__ = "menus"
 
@@ -92,6 +136,10 @@ class Menu(Base):
   # Relationships
   location = relationship("Location", back_populates="menus")
 
+  __table_args__ = (
+    Index("ix_menus_location_created", "locationId", "createdAt"),
+  )
+
 class FileUpload(Base):
   __tablename__ = "file_uploads"
 
@@ -102,6 +150,17 @@ class FileUpload(Base):
   mimeType = Column(String, nullable=False)
   uploadedAt = Column(DateTime, default=func.now())
 
+class GeocodeEntry(Base):
+  __tablename__ = "geocode_cache"
+
+  # Keyed by the normalized query string; found=False caches "No location found"
+  query = Column(String, primary_key=True)
+  found = Column(Boolean, nullable=False)
+  latitude = Column(Float)
+  longitude = Column(Float)
+  address = Column(String)
+  expiresAt = Column(DateTime, nullable=False)
+
 # class LastLogin(Base):
 #   __tablename__ = "last_logins"
 
@@ -125,8 +184,8 @@ class ChatParticipant(Base):
   __tablename__ = "chat_participants"
 
   id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-  chatId = Column(String, ForeignKey("chats.id"), nullable=False)
-  userId = Column(String, ForeignKey("users.id"), nullable=False)
+  chatId = Column(String, ForeignKey("chats.id"), nullable=False, index=True)
+  userId = Column(String, ForeignKey("users.id"), nullable=False, index=True)
   createdAt = Column(DateTime, default=func.now())
 
   chat = relationship("Chat", back_populates="participants")
@@ -142,4 +201,9 @@ class ChatMessage(Base):
   createdAt = Column(DateTime, default=func.now())
 
   chat = relationship("Chat", back_populates="messages")
-  user = relationship("User", back_populates="messages")
\ No newline at end of file
+  user = relationship("User", back_populates="messages")
+
+  __table_args__ = (
+    # Chat history and last message, newest first
+    Index("ix_chat_messages_chat_created", "chatId", "createdAt"),
+  )
\ No newline at end of file
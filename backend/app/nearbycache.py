@@ -0,0 +1,137 @@
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .config import settings
+from .spatial import locationIndex, METERS_PER_DEGREE
+
+# Radius buckets in meters; a request is served from the smallest bucket covering its radius
+RADIUS_BUCKETS = [250, 500, 1000, 2000, 3000, 5000, 10000, 20000]
+
+CacheKey = Tuple[int, int, int]
+
+class NearbyCacheEntry:
+  """Cached DB and provider results for one tile/radius bucket"""
+
+  def __init__(self, centerLat: float, centerLng: float, queryRadius: float):
+    self.centerLat = centerLat
+    self.centerLng = centerLng
+    self.queryRadius = queryRadius
+    self.dbResults: Optional[List[dict]] = None
+    self.dbExpiresAt = 0.0
+    self.providerResults: Optional[list] = None
+    self.providerExpiresAt = 0.0
+    self.cells: Set[Tuple[int, int]] = set()
+    self.size = 0
+
+class NearbyCache:
+  """Response cache for nearby queries keyed by quantized tile and radius bucket.
+
+  Our own DB hits are computed for the tile centre with the radius widened to cover the whole tile,
+  then filtered exactly per request; they live until a location or review in a covered grid cell
+  invalidates them. Provider results are shared across the tile with a short TTL.
+  """
+
+  def __init__(self):
+    self.entries: "OrderedDict[CacheKey, NearbyCacheEntry]" = OrderedDict()
+    # Grid index cell -> cache keys whose DB results cover it, for precise invalidation
+    self.cellKeys: Dict[Tuple[int, int], Set[CacheKey]] = {}
+    self.totalSize = 0
+    # Bumped by every invalidation, so fills that started before one don't store stale results
+    self.generation = 0
+    self.lock = threading.Lock()
+    self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "staleFills": 0}
+
+  def keyFor(self, lat: float, lng: float, radius: float) -> Tuple[CacheKey, NearbyCacheEntry]:
+    """Get the cache key and a blank entry describing the tile/bucket query for a request"""
+    tileDeg = settings.nearbyCacheTileDeg
+    tileLat, tileLng = math.floor(lat / tileDeg), math.floor(lng / tileDeg)
+    bucket = next((b for b in RADIUS_BUCKETS if b >= radius), int(radius))
+    centerLat = (tileLat + 0.5) * tileDeg
+    centerLng = (tileLng + 0.5) * tileDeg
+    # Half the tile diagonal in meters, so any point in the tile is covered
+    halfDiagonal = 0.5 * tileDeg * METERS_PER_DEGREE * math.sqrt(1 + math.cos(math.radians(centerLat)) ** 2)
+    entry = NearbyCacheEntry(centerLat=centerLat, centerLng=centerLng, queryRadius=bucket + halfDiagonal)
+    return (tileLat, tileLng, bucket), entry
+
+  def get(self, key: CacheKey) -> Optional[NearbyCacheEntry]:
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        self.stats["misses"] += 1
+        return None
+      self.entries.move_to_end(key)
+      self.stats["hits"] += 1
+      return entry
+
+  def put(self, key: CacheKey, entry: NearbyCacheEntry, generation: Optional[int] = None) -> None:
+    """Store or refresh an entry, evicting least recently used entries over the memory cap.
+
+    generation is self.generation when the entry's fetch started; the entry is dropped if an
+    invalidation happened since.
+    """
+    entry.size = len(json.dumps(
+      [entry.dbResults, [r.model_dump() if hasattr(r, "model_dump") else r for r in entry.providerResults or []]],
+      default=str
+    ))
+    entry.cells = set(locationIndex.cellsInRadius(entry.centerLat, entry.centerLng, entry.queryRadius))
+    with self.lock:
+      if generation is not None and generation != self.generation:
+        self.stats["staleFills"] += 1
+        return
+      self.discard(key)
+      self.entries[key] = entry
+      self.totalSize += entry.size
+      for cell in entry.cells:
+        self.cellKeys.setdefault(cell, set()).add(key)
+      while self.totalSize > settings.nearbyCacheMaxBytes and len(self.entries) > 1:
+        oldestKey = next(iter(self.entries))
+        self.discard(oldestKey)
+        self.stats["evictions"] += 1
+
+  def discard(self, key: CacheKey) -> None:
+    """Remove an entry (caller holds the lock)"""
+    entry = self.entries.pop(key, None)
+    if entry is None:
+      return
+    self.totalSize -= entry.size
+    for cell in entry.cells:
+      keys = self.cellKeys.get(cell)
+      if keys is not None:
+        keys.discard(key)
+        if not keys:
+          del self.cellKeys[cell]
+
+  def invalidatePoint(self, lat: float, lng: float) -> None:
+    """Drop every entry whose DB results cover a coordinate"""
+    self.invalidateCell(locationIndex.cellFor(lat, lng))
+
+  def invalidateLocation(self, locationId: str) -> None:
+    """Drop every entry whose DB results cover a location (e.g. after a new review)"""
+    cell = locationIndex.positions.get(locationId)
+    if cell is None:
+      # Unknown to the index; be safe and drop everything
+      self.clear()
+      return
+    self.invalidateCell(cell)
+
+  def invalidateCell(self, cell: Tuple[int, int]) -> None:
+    with self.lock:
+      self.generation += 1
+      for key in list(self.cellKeys.get(cell, ())):
+        self.discard(key)
+        self.stats["invalidations"] += 1
+
+  def clear(self) -> None:
+    with self.lock:
+      self.generation += 1
+      self.entries.clear()
+      self.cellKeys.clear()
+      self.totalSize = 0
+
+  def getStats(self) -> dict:
+    return {**self.stats, "entries": len(self.entries), "bytes": self.totalSize}
+
+nearbyCache = NearbyCache()
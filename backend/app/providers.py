@@ -0,0 +1,119 @@
+import asyncio
+import random
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+  import h2  # noqa: F401
+  http2Available = True
+except ImportError:
+  http2Available = False
+
+# Status codes worth retrying; anything else is returned to the caller as-is
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class ProviderClient:
+  """Pooled keep-alive HTTP client for one external place provider"""
+
+  def __init__(self, name: str, timeout: float):
+    self.name = name
+    self.timeout = timeout
+    self.client: Optional[httpx.AsyncClient] = None
+    self.stats: Dict[str, int] = {
+      "requests": 0,
+      "retries": 0,
+      "failures": 0,
+      "connectionsOpened": 0,
+    }
+
+  def start(self) -> None:
+    """Create the underlying connection pool"""
+    if self.client is not None:
+      return
+    limits = httpx.Limits(
+      max_connections=settings.providerMaxConnections,
+      max_keepalive_connections=settings.providerMaxKeepalive,
+      keepalive_expiry=settings.providerKeepaliveExpiry
+    )
+    self.client = httpx.AsyncClient(
+      timeout=self.timeout,
+      limits=limits,
+      http2=settings.providerHttp2 and http2Available
+    )
+    logger.info(f"{self.name} client started (http2={settings.providerHttp2 and http2Available})")
+
+  async def close(self) -> None:
+    """Close the connection pool"""
+    if self.client is not None:
+      await self.client.aclose()
+      self.client = None
+
+  async def trace(self, event: str, info: dict) -> None:
+    """httpcore trace hook, used to tell new connections from reused ones"""
+    if event == "connection.connect_tcp.complete":
+      self.stats["connectionsOpened"] += 1
+
+  async def get(self, url: str, **kwargs) -> httpx.Response:
+    """GET with retries and jittered exponential backoff on transport errors and retryable statuses"""
+    if self.client is None:
+      # Used outside the app lifecycle (scripts, tests)
+      self.start()
+
+    attempts = settings.providerRetries + 1
+    for attempt in range(attempts):
+      self.stats["requests"] += 1
+      try:
+        response = await self.client.get(url, extensions={"trace": self.trace}, **kwargs)
+        if response.status_code not in RETRYABLE_STATUS or attempt == attempts - 1:
+          return response
+        logger.info(f"{self.name} returned {response.status_code}, retrying")
+      except httpx.TransportError as e:
+        if attempt == attempts - 1:
+          self.stats["failures"] += 1
+          raise
+        logger.info(f"{self.name} transport error {e!r}, retrying")
+
+      self.stats["retries"] += 1
+      # Full jitter: sleep uniformly in [0, base * 2^attempt]
+      await asyncio.sleep(random.uniform(0, settings.providerRetryBaseDelay * 2 ** attempt))
+
+  def getStats(self) -> dict:
+    """Connection reuse statistics"""
+    sent = self.stats["requests"]
+    opened = self.stats["connectionsOpened"]
+    return {
+      **self.stats,
+      "connectionsReused": max(sent - opened, 0),
+      "reuseRatio": round(1 - opened / sent, 3) if sent else None,
+    }
+
+def serviceKeyUrl(url: str, serviceKey: str, params: dict) -> str:
+  """Build a data.go.kr request URL with serviceKey passed through verbatim.
+
+  The portal's "Encoding" keys are already percent-encoded; sending them through httpx params
+  would encode them a second time and the API rejects the key.
+  """
+  return f"{url}?serviceKey={serviceKey}&{urlencode(params)}"
+
+kakaoClient = ProviderClient("Kakao API", timeout=settings.kakaoTimeoutSeconds)
+tourapiClient = ProviderClient("Tour API", timeout=settings.tourapiTimeoutSeconds)
+
+providerClients = [kakaoClient, tourapiClient]
+
+def startProviderClients() -> None:
+  for client in providerClients:
+    client.start()
+
+async def closeProviderClients() -> None:
+  for client in providerClients:
+    await client.close()
+
+def getProviderStats() -> Dict[str, dict]:
+  return {client.name: client.getStats() for client in providerClients}
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Builds category -> ranked items from the database
+SectionBuilder = Callable[[Session], Dict[str, List[dict]]]
+
+class RecommendationSnapshot:
+  """Precomputed recommendation sections; never modified once published"""
+
+  __slots__ = ("sections", "builtAt", "buildSeconds")
+
+  def __init__(self, sections: Dict[str, List[dict]], buildSeconds: float):
+    self.sections: Dict[str, Tuple[dict, ...]] = {category: tuple(items) for category, items in sections.items()}
+    self.builtAt = time.time()
+    self.buildSeconds = buildSeconds
+
+class RecommendationSnapshots:
+  """Holder for the current recommendation snapshot, rebuilt periodically in the background.
+
+  Requests read `current` without locking: a refresh builds a whole new snapshot off the event
+  loop and publishes it with a single reference swap, so readers see either the old or the new
+  snapshot, never a partial one.
+  """
+
+  def __init__(self):
+    self.current: Optional[RecommendationSnapshot] = None
+    self.build: Optional[SectionBuilder] = None
+    self.refreshTask: Optional[asyncio.Task] = None
+    self.stats = {"builds": 0, "failures": 0}
+
+  def refresh(self, build: SectionBuilder, db: Optional[Session] = None) -> RecommendationSnapshot:
+    """Build and publish a new snapshot, with a session of its own unless one is given"""
+    started = time.perf_counter()
+    session = db or SessionLocal()
+    try:
+      sections = build(session)
+    finally:
+      if db is None:
+        session.close()
+    snapshot = RecommendationSnapshot(sections, round(time.perf_counter() - started, 4))
+    self.current = snapshot
+    self.stats["builds"] += 1
+    return snapshot
+
+  async def refreshLoop(self) -> None:
+    while True:
+      try:
+        await asyncio.to_thread(self.refresh, self.build)
+      except Exception as e:
+        self.stats["failures"] += 1
+        logger.error(f"Failed to refresh recommendation snapshot: {e}")
+      await asyncio.sleep(settings.recommendationRefreshSeconds)
+
+  def start(self, build: SectionBuilder) -> None:
+    """Build a snapshot now and every recommendationRefreshSeconds with build(db)"""
+    self.build = build
+    if self.refreshTask is None:
+      self.refreshTask = asyncio.create_task(self.refreshLoop())
+
+  async def stop(self) -> None:
+    if self.refreshTask is not None:
+      self.refreshTask.cancel()
+      try:
+        await self.refreshTask
+      except asyncio.CancelledError:
+        pass
+      self.refreshTask = None
+
+  def getStats(self) -> dict:
+    snapshot = self.current
+    return {
+      "ageSeconds": round(time.time() - snapshot.builtAt, 1) if snapshot else None,
+      "buildSeconds": snapshot.buildSeconds if snapshot else None,
+      **self.stats
+    }
+
+recommendationSnapshots = RecommendationSnapshots()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, WebSocket, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, func
 from typing import List, Optional, Dict
 import json
 import logging
@@ -13,6 +13,46 @@ from ..models import User, Chat, ChatParticipant, ChatMessage
 router = APIRouter(tags=["chat"])
 logger = logging.getLogger(__name__)
 
+# Chat queries, shared by the REST endpoints and the websocket manager
+
+def findChatBetween(db: Session, userId: str, otherUserId: str) -> Optional[Chat]:
+  """Get a chat both users participate in"""
+  return db.query(Chat).join(ChatParticipant).filter(
+    ChatParticipant.userId.in_([userId, otherUserId])
+  ).group_by(Chat.id).having(
+    func.count(ChatParticipant.userId) == 2
+  ).first()
+
+def getParticipantIds(db: Session, chatId: str) -> set:
+  participants = db.query(ChatParticipant).filter(ChatParticipant.chatId == chatId).all()
+  return {p.userId for p in participants}
+
+def getUserChats(db: Session, userId: str) -> List[ChatParticipant]:
+  """Get the user's participations in every chat"""
+  return db.query(ChatParticipant).filter(ChatParticipant.userId == userId).all()
+
+def getOtherParticipants(db: Session, chatId: str, userId: str) -> List[ChatParticipant]:
+  return db.query(ChatParticipant).filter(
+    and_(ChatParticipant.chatId == chatId, ChatParticipant.userId != userId)
+  ).all()
+
+def getOtherParticipantWithUser(db: Session, chatId: str, userId: str):
+  """Get (participant, user) of the other side of a chat, or None"""
+  return db.query(ChatParticipant, User).join(User).filter(
+    and_(ChatParticipant.chatId == chatId, ChatParticipant.userId != userId)
+  ).first()
+
+def getLastMessage(db: Session, chatId: str) -> Optional[ChatMessage]:
+  return db.query(ChatMessage).filter(
+    ChatMessage.chatId == chatId
+  ).order_by(desc(ChatMessage.createdAt)).first()
+
+def queryChatMessages(db: Session, chatId: str):
+  """Query (message, sender) pairs of a chat, newest first"""
+  return db.query(ChatMessage, User).join(User).filter(
+    ChatMessage.chatId == chatId
+  ).order_by(desc(ChatMessage.createdAt))
+
 class ChatManager:
   def __init__(self):
     # Map of userId -> WebSocket connection
@@ -132,19 +172,12 @@ class ChatManager:
     db = next(getDatabaseSession())
     try:
       # Find all chats where this user is a participant
-      user_chats = db.query(ChatParticipant).filter(
-        ChatParticipant.userId == user_id
-      ).all()
+      user_chats = getUserChats(db, user_id)
 
       contacted_users = set()
       for chat_participant in user_chats:
         # Get other participants in each chat
-        other_participants = db.query(ChatParticipant).filter(
-          and_(
-            ChatParticipant.chatId == chat_participant.chatId,
-            ChatParticipant.userId != user_id
-          )
-        ).all()
+        other_participants = getOtherParticipants(db, chat_participant.chatId, user_id)
 
         for participant in other_participants:
           contacted_users.add(participant.userId)
@@ -168,20 +201,11 @@ class ChatManager:
   def get_or_create_chat(self, db: Session, user1_id: str, user2_id: str) -> Chat:
     """Get existing chat or create new one between two users"""
     # Find existing chat between these two users
-    existing_chat = db.query(Chat).join(ChatParticipant).filter(
-      ChatParticipant.userId.in_([user1_id, user2_id])
-    ).group_by(Chat.id).having(
-      db.func.count(ChatParticipant.userId) == 2
-    ).first()
+    existing_chat = findChatBetween(db, user1_id, user2_id)
 
     if existing_chat:
       # Verify both users are in this chat
-      participants = db.query(ChatParticipant).filter(
-        ChatParticipant.chatId == existing_chat.id
-      ).all()
-      participant_ids = {p.userId for p in participants}
-
-      if {user1_id, user2_id} == participant_ids:
+      if {user1_id, user2_id} == getParticipantIds(db, existing_chat.id):
         return existing_chat
 
     # Create new chat
@@ -231,11 +255,7 @@ async def getChatHistory(
   """Get chat history between current user and another user with pagination"""
   try:
     # Find the chat between these two users
-    chat = db.query(Chat).join(ChatParticipant).filter(
-      ChatParticipant.userId.in_([current_user.id, other_user_id])
-    ).group_by(Chat.id).having(
-      db.func.count(ChatParticipant.userId) == 2
-    ).first()
+    chat = findChatBetween(db, current_user.id, other_user_id)
 
     if not chat:
       # No chat exists yet
@@ -247,21 +267,14 @@ async def getChatHistory(
       }
 
     # Verify both users are in this chat
-    participants = db.query(ChatParticipant).filter(
-      ChatParticipant.chatId == chat.id
-    ).all()
-    participant_ids = {p.userId for p in participants}
-
-    if {current_user.id, other_user_id} != participant_ids:
+    if {current_user.id, other_user_id} != getParticipantIds(db, chat.id):
       raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Not authorized to access this chat"
       )
 
     # Get messages with pagination (newest first)
-    messages_query = db.query(ChatMessage, User).join(User).filter(
-      ChatMessage.chatId == chat.id
-    ).order_by(desc(ChatMessage.createdAt))
+    messages_query = queryChatMessages(db, chat.id)
 
     total_count = messages_query.count()
     messages = messages_query.offset(offset).limit(limit).all()
@@ -300,27 +313,18 @@ async def getChatContacts(
   """Get list of users that current user has chatted with"""
   try:
     # Find all chats where current user is a participant
-    user_chats = db.query(ChatParticipant).filter(
-      ChatParticipant.userId == current_user.id
-    ).all()
+    user_chats = getUserChats(db, current_user.id)
 
     contacts = []
     for chat_participant in user_chats:
       # Get the other participant in each chat
-      other_participant = db.query(ChatParticipant, User).join(User).filter(
-        and_(
-          ChatParticipant.chatId == chat_participant.chatId,
-          ChatParticipant.userId != current_user.id
-        )
-      ).first()
+      other_participant = getOtherParticipantWithUser(db, chat_participant.chatId, current_user.id)
 
       if other_participant:
         participant, user = other_participant
 
         # Get last message in this chat
-        last_message = db.query(ChatMessage).filter(
-          ChatMessage.chatId == chat_participant.chatId
-        ).order_by(desc(ChatMessage.createdAt)).first()
+        last_message = getLastMessage(db, chat_participant.chatId)
 
         # Check if user is online
         is_online = chat_manager.is_user_online(user.id)
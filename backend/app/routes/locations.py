@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
+import io
+import json
 import logging
 
 from ..database import getDatabaseSession
@@ -9,6 +13,11 @@ from ..models import User
 from ..schemas import (
   LocationResponse,
   LocationCreate,
+  NearestLocationsResponse,
+  LocationCluster,
+  LocationImportResponse,
+  LocationDetailResponse,
+  ReviewPageResponse,
   ReviewResponse,
   ReviewCreate,
   ReviewRatingCreate,
@@ -16,6 +25,8 @@ from ..schemas import (
   PaginationParams
 )
 from ..services import LocationService, ReviewService
+from ..cursor import encodeCursor, decodeCursor
+from ..bulkimport import IMPORT_FORMATS, ImportAborted, detectFormat
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["locations"])
@@ -24,12 +35,16 @@ router = APIRouter(tags=["locations"])
 async def getNearbyLocations(
   lat: float = Query(..., description="Latitude"),
   lng: float = Query(..., description="Longitude"),
-  radius: int = Query(1000, description="Radius in meters"),
+  radius: int = Query(1000, ge=1, le=50000, description="Radius in meters"),
+  stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream batches as they arrive (ndjson or sse)"),
   db: Session = Depends(getDatabaseSession)
 ):
   """Get nearby reviewed locations"""
   try:
-    locations = LocationService.getNearbyLocations(db, lat, lng, radius)
+    if stream:
+      return await streamNearbyLocations(db, lat, lng, radius, stream)
+
+    locations = await LocationService.getNearbyLocations(db, lat, lng, radius)
     return locations
 
   except Exception as e:
@@ -39,6 +54,87 @@ async def getNearbyLocations(
       detail="Failed to fetch locations"
     )
 
+async def streamNearbyLocations(db: Session, lat: float, lng: float, radius: int, streamFormat: str) -> StreamingResponse:
+  """Stream nearby locations as NDJSON lines or server-sent events, one batch per source"""
+  batches = LocationService.streamNearbyLocations(db, lat, lng, radius)
+  # Run the DB query before the response starts so DB errors still surface as a 500
+  first = await batches.__anext__()
+
+  def encode(source: str, locations: List[dict]) -> str:
+    payload = json.dumps({
+      "source": source,
+      "locations": [LocationResponse.model_validate(location).model_dump() for location in locations]
+    }, ensure_ascii=False)
+    if streamFormat == "sse":
+      return f"event: locations\ndata: {payload}\n\n"
+    return payload + "\n"
+
+  async def body():
+    try:
+      yield encode(*first)
+      async for source, locations in batches:
+        if locations:
+          yield encode(source, locations)
+      yield "event: done\ndata: {}\n\n" if streamFormat == "sse" else json.dumps({"done": True}) + "\n"
+    finally:
+      await batches.aclose()
+
+  mediaType = "text/event-stream" if streamFormat == "sse" else "application/x-ndjson"
+  return StreamingResponse(body(), media_type=mediaType, headers={"Cache-Control": "no-cache"})
+
+@router.get("/nearest", response_model=NearestLocationsResponse)
+async def getNearestLocations(
+  lat: float = Query(..., description="Latitude"),
+  lng: float = Query(..., description="Longitude"),
+  limit: int = Query(20, ge=1, le=100, description="Number of locations to fetch"),
+  cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+  db: Session = Depends(getDatabaseSession)
+):
+  """Get our own locations closest first, paged with a keyset cursor"""
+  after = None
+  if cursor:
+    try:
+      distance, locationId = decodeCursor(cursor, 2)
+      after = (float(distance), str(locationId))
+    except (TypeError, ValueError):
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+  try:
+    locations, last = LocationService.getNearestLocations(db, lat, lng, limit, after)
+  except Exception as e:
+    logger.error(f"Error fetching nearest locations: {e}")
+    raise HTTPException(
+      status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+      detail="Failed to fetch locations"
+    )
+
+  return NearestLocationsResponse(
+    locations=locations,
+    next_cursor=encodeCursor(*last) if last else None
+  )
+
+@router.get("/clusters", response_model=List[LocationCluster])
+async def getLocationClusters(
+  south: float = Query(..., ge=-90, le=90, description="Viewport south latitude"),
+  north: float = Query(..., ge=-90, le=90, description="Viewport north latitude"),
+  west: float = Query(..., ge=-180, le=180, description="Viewport west longitude"),
+  east: float = Query(..., ge=-180, le=180, description="Viewport east longitude"),
+  zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+  db: Session = Depends(getDatabaseSession)
+):
+  """Get pre-aggregated marker clusters for a map viewport"""
+  if south > north or west > east:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid viewport")
+
+  try:
+    return LocationService.getClusters(db, south, north, west, east, zoom)
+  except Exception as e:
+    logger.error(f"Error fetching location clusters: {e}")
+    raise HTTPException(
+      status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+      detail="Failed to fetch clusters"
+    )
+
 @router.post("", response_model=LocationResponse)
 async def createLocation(
   locationData: LocationCreate,
@@ -48,44 +144,46 @@ async def createLocation(
   """Create a new location"""
   return LocationService.createLocation(db, locationData)
 
-# @router.get("/{locationId}", response_model=LocationResponse)
-# async def getLocation(
-#   locationId: str,
-#   db: Session = Depends(getDatabaseSession)
-# ):
-#   """Get a specific location"""
-#   return LocationService.getLocation(db, locationId)
+@router.post("/import", response_model=LocationImportResponse)
+async def importLocations(
+  file: UploadFile = File(..., description="CSV with a header row, or JSONL"),
+  format: Optional[str] = Query(None, pattern="^(csv|jsonl)$", description="Defaults to the file extension"),
+  currentUser: User = Depends(getCurrentUser),
+  db: Session = Depends(getDatabaseSession)
+):
+  """Bulk import locations from a CSV or JSONL upload"""
+  fmt = format or detectFormat(file.filename)
+  if fmt not in IMPORT_FORMATS:
+    raise HTTPException(
+      status_code=status.HTTP_400_BAD_REQUEST,
+      detail="Unknown import format, pass format=csv or format=jsonl"
+    )
 
-# @router.get("/{locationId}/reviews", response_model=List[ReviewResponse])
-# async def getLocationReviews(
-#   locationId: str,
-#   limit: int = Query(10, le=50, description="Number of reviews to fetch"),
-#   offset: int = Query(0, ge=0, description="Number of reviews to skip"),
-#   db: Session = Depends(getDatabaseSession)
-# ):
-#   """Fetch reviews for a specific location with pagination"""
-#   try:
-#     reviews = LocationService.getLocationReviews(db, locationId, limit, offset)
-
-#     return [
-#       ReviewResponse(
-#         id=review["id"],
-#         user=review["user"],
-#         rating=review["rating"],
-#         comment=review["comment"],
-#         timestamp=review["timestamp"],
-#         upvotes=review["upvotes"],
-#         downvotes=review["downvotes"]
-#       )
-#       for review in reviews
-#     ]
+  # utf-8-sig drops the BOM spreadsheet exports often start with
+  stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+  try:
+    report = await asyncio.to_thread(LocationService.importLocations, db, stream, fmt)
+  except ImportAborted as e:
+    # Earlier chunks are already committed, so say how many rows made it in
+    imported = f"{e.inserted} locations were imported before the error"
+    if isinstance(e.cause, UnicodeDecodeError):
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Import file must be UTF-8; {imported}")
+    logger.error(f"Error importing locations: {e}")
+    raise HTTPException(
+      status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+      detail=f"Failed to import locations; {imported}"
+    )
+  except Exception as e:
+    logger.error(f"Error importing locations: {e}")
+    raise HTTPException(
+      status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+      detail="Failed to import locations"
+    )
+  finally:
+    stream.detach()
 
-#   except Exception as e:
-#     logger.error(f"Error fetching location reviews: {e}")
-#     raise HTTPException(
-#       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-#       detail="Failed to fetch reviews"
-#     )
+  logger.info(f"User {currentUser.id} imported {report['inserted']} locations ({report['rejected']} rejected)")
+  return report
 
 # @router.post("/{locationId}/reviews")
 # async def createLocationReview(
@@ -113,35 +211,37 @@ async def createLocation(
 #       detail="Failed to create review"
 #     )
 
-# @router.post("/{locationId}/review/{reviewId}/rate", response_model=ReviewRatingResponse)
-# async def rateReview(
-#   locationId: str,
-#   reviewId: str,
-#   ratingData: ReviewRatingCreate,
-#   currentUser: User = Depends(getCurrentUser),
-#   db: Session = Depends(getDatabaseSession)
-# ):
-#   """Rate a review (upvote/downvote)"""
-#   try:
-#     result = ReviewService.rateReview(
-#       db,
-#       currentUser.id,
-#       reviewId,
-#       ratingData.rating
-#     )
+@router.post("/{locationId}/review/{reviewId}/rate", response_model=ReviewRatingResponse)
+async def rateReview(
+  locationId: str,
+  reviewId: str,
+  ratingData: ReviewRatingCreate,
+  currentUser: User = Depends(getCurrentUser),
+  db: Session = Depends(getDatabaseSession)
+):
+  """Rate a review (upvote/downvote); counts may be optimistic while the vote is buffered"""
+  try:
+    result = ReviewService.rateReview(
+      db,
+      currentUser.id,
+      reviewId,
+      ratingData.rating
+    )
 
-#     return ReviewRatingResponse(
-#       review_id=result["review_id"],
-#       upvotes=result["upvotes"],
-#       downvotes=result["downvotes"]
-#     )
+    return ReviewRatingResponse(
+      review_id=result["review_id"],
+      upvotes=result["upvotes"],
+      downvotes=result["downvotes"]
+    )
 
-#   except Exception as e:
-#     logger.error(f"Error rating review: {e}")
-#     raise HTTPException(
-#       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-#       detail="Failed to rate review"
-#     )
+  except HTTPException:
+    raise
+  except Exception as e:
+    logger.error(f"Error rating review: {e}")
+    raise HTTPException(
+      status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+      detail="Failed to rate review"
+    )
 
 @router.get("/search")
 async def searchLocations(
@@ -151,4 +251,55 @@ async def searchLocations(
   db: Session = Depends(getDatabaseSession)
 ):
   """Search for locations"""
-  return LocationService.searchLocations(db, query, lat, lng)
\ No newline at end of file
+  return await LocationService.searchLocations(db, query, lat, lng)
+
+# Registered last so the fixed paths above (/search, /nearest, ...) aren't captured as ids
+@router.get("/{locationId}", response_model=LocationDetailResponse)
+async def getLocation(
+  locationId: str,
+  request: Request,
+  response: Response,
+  db: Session = Depends(getDatabaseSession)
+):
+  """Get a location with its ratings, images, menus and top reviews; revalidate with If-None-Match"""
+  etag = LocationService.getLocationETag(db, locationId)
+  if etag is None:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+
+  headers = {"ETag": etag, "Cache-Control": "no-cache"}
+  if etag in request.headers.get("if-none-match", ""):
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+  location = LocationService.getLocation(db, locationId)
+  response.headers.update(headers)
+  return location
+
+@router.get("/{locationId}/reviews", response_model=ReviewPageResponse)
+async def getLocationReviews(
+  locationId: str,
+  limit: int = Query(10, ge=1, le=50, description="Number of reviews to fetch"),
+  cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+  db: Session = Depends(getDatabaseSession)
+):
+  """Fetch reviews for a location, most helpful first, paged with a keyset cursor"""
+  after = None
+  if cursor:
+    try:
+      helpfulness, reviewId = decodeCursor(cursor, 2)
+      after = (float(helpfulness), str(reviewId))
+    except (TypeError, ValueError):
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+  try:
+    reviews, last = LocationService.getLocationReviews(db, locationId, limit, after)
+  except Exception as e:
+    logger.error(f"Error fetching location reviews: {e}")
+    raise HTTPException(
+      status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+      detail="Failed to fetch reviews"
+    )
+
+  return ReviewPageResponse(
+    reviews=reviews,
+    next_cursor=encodeCursor(*last) if last else None
+  )
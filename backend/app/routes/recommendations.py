@@ -12,11 +12,13 @@ def recommendations(
     lat: Optional[float] = Query(None),
     lng: Optional[float] = Query(None),
     per_category: int = Query(8, ge=1, le=50),  # 서비스 기본(8)에 맞춤
+    radius: int = Query(5000, ge=1, le=50000, description="Radius in meters for the nearby section"),
     db: Session = Depends(getDatabaseSession),
 ):
     return RecommendationService.getRecommendations(
         db,
         lat=lat,
         lng=lng,
-        per_category=per_category
+        per_category=per_category,
+        radius=radius
     )
@@ -47,10 +47,40 @@ class LocationResponse(BaseModel):
   description: Optional[str] = None
   avg_rating: Optional[float] = None
   review_count: Optional[int] = None
+  # Review counts for 1..5 stars
+  rating_histogram: Optional[List[int]] = None
+  # Source -> id for every source this place was merged from ("bapful", "kakao", "tourapi")
+  provider_ids: Optional[Dict[str, str]] = None
 
   class Config:
     from_attributes = True
 
+class NearestLocation(LocationResponse):
+  distance: float
+
+class NearestLocationsResponse(BaseModel):
+  locations: List[NearestLocation]
+  # Opaque keyset cursor for the next page; None when there are no more results
+  next_cursor: Optional[str] = None
+
+class LocationCluster(BaseModel):
+  count: int
+  # Centroid of the clustered locations
+  coordinates: Coordinates
+  top_location: Optional[LocationResponse] = None
+
+class LocationImportError(BaseModel):
+  line: int
+  error: str
+
+class LocationImportResponse(BaseModel):
+  inserted: int
+  rejected: int
+  # First rejected rows only; rejected has the full count
+  errors: List[LocationImportError]
+  elapsed_seconds: float
+  rows_per_second: float
+
 class KakaoLocation(BaseModel):
   id: str
   name: str
@@ -60,6 +90,7 @@ class KakaoLocation(BaseModel):
   description: Optional[str] = None
   avg_rating: Optional[float] = None
   review_count: Optional[int] = None
+  provider_ids: Optional[Dict[str, str]] = None
 
   @classmethod
   def fromKakaoAPIResult(cls, location: dict):
@@ -69,7 +100,8 @@ class KakaoLocation(BaseModel):
       location_type=location["category_group_name"],
       coordinates=Coordinates.from_x_y(location["x"], location["y"]),
       address=location["address_name"],
-      description=location["place_url"]
+      description=location["place_url"],
+      provider_ids={"kakao": location["id"]}
     )
 
 class TourAPILocation(BaseModel):
@@ -81,6 +113,7 @@ class TourAPILocation(BaseModel):
   description: Optional[str] = None
   avg_rating: Optional[float] = None
   review_count: Optional[int] = None
+  provider_ids: Optional[Dict[str, str]] = None
 
   @classmethod
   def fromTourAPIResult(cls, location: dict):
@@ -90,6 +123,7 @@ class TourAPILocation(BaseModel):
       location_type=location["rlteCtgryLclsNm"],
       coordinates=Coordinates.from_x_y(location["x"], location["y"]),
       address=location["address"],
+      provider_ids={"tourapi": location["tAtsCd"]}
     )
 
 class LocationsQuery(BaseModel):
@@ -118,6 +152,11 @@ class ReviewResponse(BaseModel):
   upvotes: Optional[int] = 0
   downvotes: Optional[int] = 0
 
+class ReviewPageResponse(BaseModel):
+  reviews: List[ReviewResponse]
+  # Opaque keyset cursor for the next page; None on the last page
+  next_cursor: Optional[str] = None
+
 class ReviewRatingResponse(BaseModel):
   reviewId: str = Field(alias="review_id")
   upvotes: int
@@ -144,6 +183,22 @@ class MenuResponse(BaseModel):
   menuId: str = Field(alias="menu_id")
   translatedItems: List[MenuLabel] = Field(alias="translated_items")
 
+class LocationImage(BaseModel):
+  id: str
+  image_url: str
+  created_at: Optional[datetime] = None
+
+class LocationMenu(MenuResponse):
+  photoUrl: str = Field(alias="photo_url")
+
+class LocationDetailResponse(LocationResponse):
+  images: List[LocationImage] = []
+  # Latest menus first
+  menus: List[LocationMenu] = []
+  # Most helpful reviews first
+  reviews: List[ReviewResponse] = []
+  updated_at: Optional[datetime] = None
+
 # Pagination
 class PaginationParams(BaseModel):
   limit: int = Field(default=10, le=50)
@@ -0,0 +1,198 @@
+import logging
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Trigram tokens need at least 3 characters; shorter keywords use the locations_grams index
+MIN_TRIGRAM_LENGTH = 3
+# Ranking weights of the name, address and description columns
+COLUMN_WEIGHTS = (10.0, 2.0, 1.0)
+WEIGHT_PARAMS = dict(zip(("nameWeight", "addressWeight", "descriptionWeight"), COLUMN_WEIGHTS))
+# locations_grams only covers this many leading characters of each column
+MAX_GRAM_POSITION = 1024
+
+# External-content FTS5 table over locations, kept in sync by triggers
+LOCATION_SEARCH_DDL = [
+  """
+  CREATE VIRTUAL TABLE IF NOT EXISTS locations_fts USING fts5(
+    name, address, description,
+    content='locations', content_rowid='rowid', tokenize='trigram'
+  )
+  """,
+  """
+  CREATE TRIGGER IF NOT EXISTS locations_fts_insert AFTER INSERT ON locations BEGIN
+    INSERT INTO locations_fts(rowid, name, address, description)
+    VALUES (new.rowid, new.name, new.address, new.description);
+  END
+  """,
+  """
+  CREATE TRIGGER IF NOT EXISTS locations_fts_delete AFTER DELETE ON locations BEGIN
+    INSERT INTO locations_fts(locations_fts, rowid, name, address, description)
+    VALUES ('delete', old.rowid, old.name, old.address, old.description);
+  END
+  """,
+  """
+  CREATE TRIGGER IF NOT EXISTS locations_fts_update AFTER UPDATE OF name, address, description ON locations BEGIN
+    INSERT INTO locations_fts(locations_fts, rowid, name, address, description)
+    VALUES ('delete', old.rowid, old.name, old.address, old.description);
+    INSERT INTO locations_fts(rowid, name, address, description)
+    VALUES (new.rowid, new.name, new.address, new.description);
+  END
+  """,
+]
+
+# Every 2-character substring (and each column's last character) of name/address/description,
+# for keywords too short for trigrams. A substring starting at position p is the gram at p, so a
+# 1-2 character keyword is an indexed range lookup on gram. Triggers expand columns against a
+# table of positions since SQLite triggers can't loop.
+GRAM_COLUMNS = ("name", "address", "description")
+
+def gramRows(row: str, source: str = "locations_gram_positions") -> str:
+  """SELECT of (gram, docid, field) for every column of a location row, with positions from source"""
+  return " UNION ALL ".join(
+    f"SELECT lower(substr({row}.{column}, pos, 2)), {row}.rowid, {field} FROM {source} "
+    f"WHERE pos <= length({row}.{column})"
+    for field, column in enumerate(GRAM_COLUMNS)
+  )
+
+LOCATION_GRAMS_DDL = [
+  """
+  CREATE TABLE IF NOT EXISTS locations_grams (
+    gram TEXT NOT NULL,
+    docid INTEGER NOT NULL,
+    field INTEGER NOT NULL,
+    PRIMARY KEY (gram, docid, field)
+  ) WITHOUT ROWID
+  """,
+  "CREATE INDEX IF NOT EXISTS ix_locations_grams_docid ON locations_grams (docid)",
+  "CREATE TABLE IF NOT EXISTS locations_gram_positions (pos INTEGER PRIMARY KEY)",
+  f"""
+  INSERT OR IGNORE INTO locations_gram_positions (pos)
+  WITH RECURSIVE positions(pos) AS (SELECT 1 UNION ALL SELECT pos + 1 FROM positions WHERE pos < {MAX_GRAM_POSITION})
+  SELECT pos FROM positions
+  """,
+  f"""
+  CREATE TRIGGER IF NOT EXISTS locations_grams_insert AFTER INSERT ON locations BEGIN
+    INSERT OR IGNORE INTO locations_grams (gram, docid, field) {gramRows("new")};
+  END
+  """,
+  """
+  CREATE TRIGGER IF NOT EXISTS locations_grams_delete AFTER DELETE ON locations BEGIN
+    DELETE FROM locations_grams WHERE docid = old.rowid;
+  END
+  """,
+  f"""
+  CREATE TRIGGER IF NOT EXISTS locations_grams_update AFTER UPDATE OF name, address, description ON locations BEGIN
+    DELETE FROM locations_grams WHERE docid = old.rowid;
+    INSERT OR IGNORE INTO locations_grams (gram, docid, field) {gramRows("new")};
+  END
+  """,
+]
+
+LOCATION_GRAMS_REBUILD = [
+  "DELETE FROM locations_grams",
+  f"INSERT OR IGNORE INTO locations_grams (gram, docid, field) "
+  f"{gramRows('l', 'locations l JOIN locations_gram_positions')}",
+]
+
+# Insert triggers skipped during bulk loads, with the statements recreating them
+INSERT_TRIGGERS = {
+  "locations_fts_insert": LOCATION_SEARCH_DDL[1],
+  "locations_grams_insert": LOCATION_GRAMS_DDL[4],
+}
+
+def supportsLocationSearchIndex(engine: Engine) -> bool:
+  return engine.dialect.name == "sqlite"
+
+def ensureLocationSearchIndex(engine: Engine) -> bool:
+  """Create the FTS5 and gram tables and triggers if missing, backfilling from locations when any was missing"""
+  if not supportsLocationSearchIndex(engine):
+    return False
+  with engine.begin() as conn:
+    existing = {row[0] for row in conn.execute(text(
+      "SELECT name FROM sqlite_master WHERE name IN "
+      "('locations_fts', 'locations_fts_insert', 'locations_grams', 'locations_grams_insert')"
+    ))}
+    for statement in LOCATION_SEARCH_DDL + LOCATION_GRAMS_DDL:
+      conn.execute(text(statement))
+    # An insert trigger is only missing after an interrupted bulk import (deferredLocationSearchIndex)
+    if len(existing) < 4:
+      conn.execute(text("INSERT INTO locations_fts(locations_fts) VALUES ('rebuild')"))
+      for statement in LOCATION_GRAMS_REBUILD:
+        conn.execute(text(statement))
+  return True
+
+def rebuildLocationSearchIndex(db: Session) -> None:
+  """Rebuild the FTS5 and gram tables from locations (after bulk writes)"""
+  db.execute(text("INSERT INTO locations_fts(locations_fts) VALUES ('rebuild')"))
+  for statement in LOCATION_GRAMS_REBUILD:
+    db.execute(text(statement))
+
+@contextmanager
+def deferredLocationSearchIndex(db: Session) -> Iterator[None]:
+  """Skip per-row search index maintenance for inserts inside the block and rebuild the indexes once at the end.
+
+  For bulk loads; the insert triggers are dropped for the duration, and restored (with a full rebuild)
+  even if the block fails. After a crash mid-block, ensureLocationSearchIndex repairs them at startup.
+  """
+  if not supportsLocationSearchIndex(db.get_bind()):
+    yield
+    return
+  for trigger in INSERT_TRIGGERS:
+    db.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+  db.commit()
+  try:
+    yield
+  finally:
+    db.rollback()
+    for statement in INSERT_TRIGGERS.values():
+      db.execute(text(statement))
+    rebuildLocationSearchIndex(db)
+    db.commit()
+
+def searchLocationIds(db: Session, keyword: str, limit: int) -> Optional[List[str]]:
+  """Get location ids matching keyword as a substring of name/address/description, best first.
+
+  Keywords of 3+ characters are ranked by bm25 over the trigram index; shorter ones by the
+  weighted count of matching grams. Name matches are weighted above address and description.
+
+  Returns None when the index can't serve the query, so callers fall back to LIKE.
+  """
+  keyword = keyword.strip()
+  if not keyword or not supportsLocationSearchIndex(db.get_bind()):
+    return None
+  try:
+    if len(keyword) < MIN_TRIGRAM_LENGTH:
+      rows = searchShortKeyword(db, keyword, limit)
+    else:
+      # Quote as a single FTS5 phrase so user input is never parsed as query syntax
+      phrase = '"' + keyword.replace('"', '""') + '"'
+      rows = db.execute(text(
+        "SELECT l.id FROM locations_fts JOIN locations l ON l.rowid = locations_fts.rowid "
+        "WHERE locations_fts MATCH :phrase ORDER BY bm25(locations_fts, :nameWeight, :addressWeight, :descriptionWeight) "
+        "LIMIT :limit"
+      ), {"phrase": phrase, "limit": limit, **WEIGHT_PARAMS}).all()
+  except Exception as e:
+    logger.warning(f"Location search index unavailable: {e}")
+    return None
+  return [row[0] for row in rows]
+
+def searchShortKeyword(db: Session, keyword: str, limit: int) -> list:
+  """Look up a 1-2 character keyword in locations_grams.
+
+  Every gram starting with the keyword marks an occurrence, which is a range scan on the primary
+  key; locations are scored by their occurrences weighted by column.
+  """
+  return db.execute(text(
+    "SELECT l.id FROM ("
+    "  SELECT docid, SUM(CASE field WHEN 0 THEN :nameWeight WHEN 1 THEN :addressWeight ELSE :descriptionWeight END) AS score"
+    "  FROM locations_grams WHERE gram BETWEEN lower(:keyword) AND lower(:keyword) || :maxChar"
+    "  GROUP BY docid"
+    ") matches JOIN locations l ON l.rowid = matches.docid "
+    "ORDER BY matches.score DESC, l.rowid LIMIT :limit"
+  ), {"keyword": keyword, "maxChar": chr(0x10FFFF), "limit": limit, **WEIGHT_PARAMS}).all()
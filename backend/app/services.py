@@ -1,16 +1,38 @@
 import uuid
+import hashlib
 import random
-import requests
-
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from math import radians, cos, sin, asin, sqrt
+import time
+import asyncio
+import heapq
+import itertools
+import logging
+import numpy as np
+from datetime import datetime
+
+from typing import AsyncIterator, Dict, List, Optional, TextIO, Tuple
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import case, func, and_, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from math import radians, cos, sin, asin, sqrt, ceil
 from fastapi import HTTPException
 
 from .config import settings
-from .models import User, Location, Review, ReviewRating, Menu
+from .models import User, Location, LocationStats, Review, ReviewRating, Menu, Image
 from .schemas import MenuLabel, BoundingBox, LocationCreate, KakaoLocation, TourAPILocation, LocationResponse
+from .spatial import locationIndex, boundingBox
+from .clusters import clusterIndex
+from .providers import kakaoClient, tourapiClient, serviceKeyUrl
+from .geocache import geocodeCache, MISS
+from .tourareas import tourAreaCodes
+from .nearbycache import nearbyCache, NearbyCacheEntry
+from .search import searchLocationIds
+from .merge import mergeLocations, LocationMerger
+from .breaker import breakers, callWithBreaker
+from .bulkimport import ImportAborted, importLocations
+from .votebuffer import voteBuffer
+from .recsnapshot import recommendationSnapshots
+
+logger = logging.getLogger(__name__)
 
 def calculateDistance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
   """Calculate distance between two coordinates in meters using Haversine formula"""
@@ -23,38 +45,185 @@ def calculateDistance(lat1: float, lng1: float, lat2: float, lng2: float) -> flo
   r = 6371000  # Radius of earth in meters
   return c * r
 
+def calculateDistances(
+  lat: float,
+  lng: float,
+  lats: np.ndarray,
+  lngs: np.ndarray,
+  approximate: bool = False
+) -> np.ndarray:
+  """Calculate distances in meters from one origin to arrays of coordinates in one vectorized pass.
+
+  With approximate=True the equirectangular projection is used instead of Haversine.
+  Against Haversine its error is under 1cm for distances up to 10km at latitudes up to 60 degrees,
+  so it is only meant for small radii.
+  """
+  r = 6371000  # Radius of earth in meters
+  lat1, lng1 = radians(lat), radians(lng)
+  lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+  lng2 = np.radians(np.asarray(lngs, dtype=np.float64))
+
+  if approximate:
+    x = (lng2 - lng1) * np.cos((lat1 + lat2) / 2)
+    y = lat2 - lat1
+    return r * np.hypot(x, y)
+
+  a = np.sin((lat2 - lat1) / 2)**2 + cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2)**2
+  return 2 * r * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def wilsonLowerBound(upvotes: int, downvotes: int, z: float = 1.96) -> float:
+  """Lower bound of the Wilson score interval for the upvote ratio (95% confidence by default)"""
+  n = upvotes + downvotes
+  if n == 0:
+    return 0.0
+  p = upvotes / n
+  return (p + z * z / (2 * n) - z * sqrt((p * (1 - p) + z * z / (4 * n)) / n)) / (1 + z * z / n)
+
+RATING_STARS = range(1, 6)
+# Largest radius (meters) Kakao keyword search accepts
+KAKAO_MAX_RADIUS = 20000
+
+def ratingLowerBound(histogram: List[int], z: float = 1.96) -> float:
+  """Lower confidence bound of the mean star rating for a 1..5 star histogram.
+
+  Each star gets one pseudo-review (a uniform Dirichlet prior), so a single 5-star review
+  doesn't outrank hundreds of 4.8 averages.
+  """
+  counts = [count + 1 for count in histogram]
+  n = sum(counts)
+  mean = sum(star * count for star, count in zip(RATING_STARS, counts)) / n
+  meanSquare = sum(star * star * count for star, count in zip(RATING_STARS, counts)) / n
+  return mean - z * sqrt(max(meanSquare - mean * mean, 0.0) / (n + 1))
+
+def useApproximateDistance(radius: float) -> bool:
+  """Whether a radius is small enough for the opt-in equirectangular fast path"""
+  return radius <= settings.approximateDistanceMaxRadius
+
+def filterInRadius(records: Optional[List[dict]], lat: float, lng: float, radius: float) -> List[dict]:
+  """Keep the location records within radius metres of (lat, lng)"""
+  if not records:
+    return []
+  distances = calculateDistances(
+    lat, lng,
+    np.array([r["coordinates"]["lat"] for r in records], dtype=np.float64),
+    np.array([r["coordinates"]["lng"] for r in records], dtype=np.float64),
+    approximate=useApproximateDistance(radius)
+  )
+  return [r for r, distance in zip(records, distances) if distance <= radius]
+
 class LocationService:
   """Service for location-related operations"""
 
-  # Use area based search for now
-  # Use area based search for now
-  tourAPIUrl = f"http://apis.data.go.kr/B551011/TarRlteTarService1/areaBasedList1?serviceKey={settings.tourapiKey}&numOfRows=10&pageNo=1&MobileOS=ETC&MobileApp=AppTest&baseYm=202503&areaCd=51&signguCd=51130&_type=json"
-  tourAPIMandatoryUrl = f'https://apis.data.go.kr/B551011/EngService2/areaCode2?MobileOS=ETC&MobileApp=Bapful&serviceKey={settings.tourapiMandatoryKey}'
+  # Use area based search for now, area codes resolved from lat/lng by tourAreaCodes
+  tourAPIUrl = settings.tourAPIUrl
+
+  kakaoAPIUrl = settings.kakaoAPIUrl
+
+
+  @staticmethod
+  def locationETag(
+    location: Location,
+    stats: Optional[LocationStats],
+    reviews: List[Tuple[str, int, int]],
+    imageIds: List[str],
+    menuIds: List[str]
+  ) -> str:
+    """Validator for the detail response.
+
+    Derived from the location and stats update times plus what the embedded lists show: the top
+    reviews' (id, upvotes, downvotes) in order, since votes reorder them without touching either
+    row, and the embedded image and menu ids.
+    """
+    version = ":".join([
+      f"{location.id}:{location.updatedAt}:{stats.updatedAt if stats else None}:{stats.reviewCount if stats else 0}",
+      ",".join(f"{reviewId}/{upvotes}/{downvotes}" for reviewId, upvotes, downvotes in reviews),
+      ",".join(sorted(imageIds)),
+      ",".join(sorted(menuIds))
+    ])
+    return '"' + hashlib.sha1(version.encode("utf-8")).hexdigest() + '"'
 
-  kakaoAPIUrl = "https://dapi.kakao.com/v2/local/search/keyword.json"
+  @staticmethod
+  def detailSelects(locationId: str) -> tuple:
+    """Get the (image, menu, review) id selects picking what the detail response embeds"""
+    def firstIds(model, limit: int, *order):
+      return select(model.id).where(model.locationId == locationId).order_by(*order).limit(limit)
+
+    return (
+      firstIds(Image, settings.detailImageLimit, Image.createdAt),
+      firstIds(Menu, settings.detailMenuLimit, Menu.createdAt.desc()),
+      firstIds(Review, settings.detailReviewLimit, Review.helpfulness.desc(), Review.id.desc())
+    )
 
+  @staticmethod
+  def getLocationETag(db: Session, locationId: str) -> Optional[str]:
+    """Get the current detail ETag, or None if the location doesn't exist.
+
+    Four small indexed queries, without loading users, menu items or image rows.
+    """
+    row = LocationService.queryWithStats(db).filter(Location.id == locationId).first()
+    if not row:
+      return None
+    imageIds, menuIds, reviewIds = LocationService.detailSelects(locationId)
+    reviews = db.query(Review.id, Review.upvotes, Review.downvotes).filter(
+      Review.id.in_(reviewIds)
+    ).order_by(Review.helpfulness.desc(), Review.id.desc()).all()
+    return LocationService.locationETag(
+      *row,
+      reviews,
+      db.execute(imageIds).scalars().all(),
+      db.execute(menuIds).scalars().all()
+    )
 
   @staticmethod
   def getLocation(db: Session, locationId: str) -> dict:
-    """Get a specific location"""
-    location = db.query(Location).filter(Location.id == locationId).first()
-    if not location:
+    """Get a location with its aggregates, first images, latest menus and top reviews.
+
+    The relationships are eager loaded with per-relationship limits, so this is a fixed four
+    queries (location and stats, images, menus, reviews with users) whatever the location's size.
+    """
+    imageIds, menuIds, reviewIds = LocationService.detailSelects(locationId)
+
+    row = LocationService.queryWithStats(db).options(
+      selectinload(Location.images.and_(Image.id.in_(imageIds))),
+      selectinload(Location.menus.and_(Menu.id.in_(menuIds))),
+      selectinload(Location.reviews.and_(Review.id.in_(reviewIds))).joinedload(Review.user)
+    ).filter(Location.id == locationId).first()
+    if not row:
       raise HTTPException(status_code=404, detail="Location not found")
-    # get avg rating and review count
-    location.coordinates = {
-      "lat": location.latitude,
-      "lng": location.longitude
-    }
-    location.avg_rating = 4.0
-    location.review_count = 10
-    location.location_type = "restaurant"
+    location, stats = row
+
+    reviews = sorted(location.reviews, key=lambda review: (review.helpfulness, review.id), reverse=True)
 
-    return location
+    return {
+      **LocationService.toSummary(location, stats),
+      "address": location.address,
+      "description": location.description,
+      "images": [
+        {"id": image.id, "image_url": image.imageUrl, "created_at": image.createdAt}
+        for image in sorted(location.images, key=lambda image: image.createdAt)
+      ],
+      "menus": [
+        {"menu_id": menu.id, "photo_url": menu.photoUrl, "translated_items": menu.translatedItems or []}
+        for menu in sorted(location.menus, key=lambda menu: menu.createdAt, reverse=True)
+      ],
+      "reviews": [
+        {
+          "id": review.id,
+          "user": {"id": review.user.id, "name": review.user.name},
+          "rating": review.rating,
+          "comment": review.comment,
+          "timestamp": review.createdAt,
+          "upvotes": review.upvotes,
+          "downvotes": review.downvotes
+        }
+        for review in reviews
+      ],
+      "updated_at": location.updatedAt
+    }
 
   @staticmethod
   def createLocation(db: Session, locationData: LocationCreate) -> dict:
     """Create a new location"""
-    print(locationData)
     # if currentUser.role != "admin":
     #   raise HTTPException(status_code=403, detail="You are not authorized to create a location")
 
@@ -70,48 +239,82 @@ class LocationService:
     db.add(location)
     db.commit()
     db.refresh(location)
+    locationIndex.add(location.id, location.latitude, location.longitude)
+    clusterIndex.add(location.id, location.latitude, location.longitude)
+    nearbyCache.invalidatePoint(location.latitude, location.longitude)
 
     return LocationService.getLocation(db, location.id)
 
   @staticmethod
-  def getTourAPILocations(lat: float, lng: float, radius: int = 1000) -> dict:
+  def importLocations(db: Session, stream: TextIO, fmt: str) -> dict:
+    """Bulk import locations (see bulkimport.importLocations), then refresh the in-process indexes once, even if it fails part way"""
+    inserted = 0
+    try:
+      report = importLocations(db, stream, fmt)
+      inserted = report["inserted"]
+      return report
+    except ImportAborted as e:
+      inserted = e.inserted
+      raise
+    finally:
+      # Chunks commit as they go, so a failed import can still have added rows
+      if inserted:
+        locationIndex.rebuildFromDatabase(db)
+        clusterIndex.rebuildFromDatabase(db)
+        nearbyCache.clear()
+
+  @staticmethod
+  async def getTourAPILocations(lat: float, lng: float, radius: int = 1000) -> dict:
     """Get locations from tour API"""
-    response = requests.get(LocationService.tourAPIMandatoryUrl).json()
-    # Logic to get area code for API from lat, lng
-    response = requests.get(LocationService.tourAPIUrl).json()
+    areaCode, sigunguCode = await tourAreaCodes.resolve(lat, lng)
+    response = (await tourapiClient.get(serviceKeyUrl(LocationService.tourAPIUrl, settings.tourapiKey, {
+      "numOfRows": 10,
+      "pageNo": 1,
+      "MobileOS": "ETC",
+      "MobileApp": "AppTest",
+      "baseYm": "202503",
+      "areaCd": areaCode,
+      "signguCd": sigunguCode,
+      "_type": "json"
+    }))).json()
     try:
       items = response['response']['body']['items']['item']
     except:
       print("Tour API: No items found or invalid response structure")
       return []
-    result = []
-    for item in items:
-      if item['rlteCtgryLclsNm'] != "음식":
-        continue
+    foodItems = [item for item in items if item['rlteCtgryLclsNm'] == "음식"]
+
+    # Geocode all items concurrently (bounded), keeping TourAPI order and isolating failures
+    semaphore = asyncio.Semaphore(settings.geocodeConcurrency)
+
+    async def geocode(item: dict) -> Optional[TourAPILocation]:
       # Extract name and find coordinates
       name = item['rlteTatsNm']
       try:
-        coordinates = LocationService.getCoordFromKakao(name)
+        async with semaphore:
+          coordinates = await LocationService.getCoordFromKakao(name)
         item['x'] = coordinates[1]
         item['y'] = coordinates[0]
         item['address'] = coordinates[2]
-        tourLocation = TourAPILocation.fromTourAPIResult(item)
-        result.append(tourLocation)
+        return TourAPILocation.fromTourAPIResult(item)
       except Exception as e:
         print(f"Tour API: Failed to get coordinates for '{name}': {e}")
-        continue
+        return None
+
+    geocoded = await asyncio.gather(*(geocode(item) for item in foodItems))
+    result = [location for location in geocoded if location is not None]
 
     resultToLocationResponse = [LocationResponse.model_validate(location) for location in result]
 
     return resultToLocationResponse
 
   @staticmethod
-  def getKakaoLocations(lat: float, lng: float, radius: int = 1000, query: str = "음식") -> List[dict]:
+  async def getKakaoLocations(lat: float, lng: float, radius: int = 1000, query: str = "음식") -> List[dict]:
     """Get locations from Kakao API"""
-    # Fix URL construction: y=lat, x=lng, add radius parameter
-    queryUrl = f"{LocationService.kakaoAPIUrl}?query={query}&x={lat}&y={lng}&radius={radius}"
-    response = requests.get(
-      queryUrl,
+    # Kakao expects x=lng, y=lat
+    response = await kakaoClient.get(
+      LocationService.kakaoAPIUrl,
+      params={"query": query, "x": lng, "y": lat, "radius": min(ceil(radius), KAKAO_MAX_RADIUS)},
       headers={"Authorization": f"KakaoAK {settings.kakaomap_restapi_key}"}
     )
 
@@ -122,11 +325,17 @@ class LocationService:
     return resultToLocationResponse
 
   @staticmethod
-  def getCoordFromKakao(queryName: str) -> Tuple[float, float, str]:
-    """Get coordinates from Kakao API"""
-    queryUrl = f"{LocationService.kakaoAPIUrl}?query={queryName}"
-    response = requests.get(
-      queryUrl,
+  async def getCoordFromKakao(queryName: str) -> Tuple[float, float, str]:
+    """Get coordinates from Kakao API, going through the geocode cache"""
+    cached = await geocodeCache.get(queryName)
+    if cached is not MISS:
+      if cached is None:
+        raise Exception("No location found for query")
+      return cached
+
+    response = await kakaoClient.get(
+      LocationService.kakaoAPIUrl,
+      params={"query": queryName},
       headers={"Authorization": f"KakaoAK {settings.kakaomap_restapi_key}"}
     )
 
@@ -135,135 +344,398 @@ class LocationService:
 
     data = response.json()
     if not data.get("documents") or len(data["documents"]) == 0:
+        await geocodeCache.put(queryName, None)
         raise Exception("No location found for query")
 
     doc = data["documents"][0]
-    return float(doc["y"]), float(doc["x"]), doc["address_name"]
-
-  @staticmethod
-  def getNearbyLocations(db: Session, lat: float, lng: float, radius: int = 1000) -> List[dict]:
-    """Get locations within radius with average ratings (simple in-Python filter)."""
-    locations = db.query(Location).all()
-    results: List[dict] = []
-    for loc in locations:
-      distance = calculateDistance(lat, lng, loc.latitude, loc.longitude)
-      if distance <= radius:
-        # Aggregate rating (avg & count)
-        review_q = db.query(Review).filter(Review.locationId == loc.id)
-        review_count = review_q.count()
-        if review_count:
-          avg_rating = sum(r.rating for r in review_q) / review_count
-        else:
-          avg_rating = 0.0
-        results.append({
-          "id": loc.id,
-          "name": loc.name,
-          "location_type": loc.location_type,
-          "coordinates": {"lat": loc.latitude, "lng": loc.longitude},
-          "avg_rating": round(avg_rating, 2),
-          "review_count": review_count
-        })
-
-    # """Get locations within radius with average ratings"""
-    # # Query the database for locations within radius
-    # locations = db.query(Location).filter(
-    #   func.sqrt(
-    #     (Location.latitude - lat) * (Location.latitude - lat) + (Location.longitude - lng) * (Location.longitude - lng)
-    #   ) <= radius
-    # ).all()
-
-    # Add minimal error handling to prevent 500 errors
-    kakaoLocations = []
-    tourAPILocations = []
+    coordinates = float(doc["y"]), float(doc["x"]), doc["address_name"]
+    await geocodeCache.put(queryName, coordinates)
+    return coordinates
 
+  @staticmethod
+  async def withDeadline(provider: str, coro, deadline: float) -> Optional[List[dict]]:
+    """Await a provider call, returning None if it fails or misses the deadline"""
     try:
-        kakaoLocations = LocationService.getKakaoLocations(lat, lng, radius)
+      return await asyncio.wait_for(coro, timeout=deadline)
+    except asyncio.TimeoutError:
+      logger.warning(f"{provider} missed its {deadline}s deadline, dropping from response")
     except Exception as e:
-        print(f"Kakao API failed: {e}")
-        kakaoLocations = []
+      logger.warning(f"{provider} failed: {e}")
+    return None
 
-    try:
-        tourAPILocations = LocationService.getTourAPILocations(lat, lng, radius)
-    except Exception as e:
-        print(f"Tour API failed: {e}")
-        tourAPILocations = []
+  @staticmethod
+  async def callProvider(provider: str, key: tuple, call, deadline: float) -> Optional[List[dict]]:
+    """Call a provider through its circuit breaker with a deadline.
+
+    call() creates the provider coroutine. When the breaker is open or the call fails, the last good
+    result for the same key is returned instead (None if there is none).
+    """
+    return await callWithBreaker(
+      breakers[provider], key, call,
+      lambda coro: LocationService.withDeadline(provider, coro, deadline)
+    )
+
+  @staticmethod
+  def queryWithStats(db: Session):
+    """Query (Location, LocationStats) pairs; stats is None for locations without reviews"""
+    return db.query(Location, LocationStats).outerjoin(
+      LocationStats, LocationStats.locationId == Location.id
+    )
+
+  @staticmethod
+  def toSummary(loc: Location, stats: Optional[LocationStats]) -> dict:
+    """Build the summary dict returned by list endpoints"""
+    return {
+      "id": loc.id,
+      "name": loc.name,
+      "location_type": loc.location_type,
+      "coordinates": {"lat": loc.latitude, "lng": loc.longitude},
+      "avg_rating": round(stats.avgRating, 2) if stats else 0.0,
+      "review_count": stats.reviewCount if stats else 0,
+      "rating_histogram": stats.histogram if stats else [0] * len(RATING_STARS),
+      "provider_ids": {"bapful": loc.id}
+    }
+
+  @staticmethod
+  def queryLocationsInRadius(db: Session, lat: float, lng: float, radius: float) -> List[Tuple[Location, float]]:
+    """Get (location, distance) pairs within radius metres, prefiltered by an indexed bounding box in SQL"""
+    south, north, west, east = boundingBox(lat, lng, radius)
+    boxed = db.query(Location).filter(
+      Location.latitude.between(south, north),
+      Location.longitude.between(west, east)
+    ).all()
+
+    if not boxed:
+      return []
+
+    distances = calculateDistances(
+      lat, lng,
+      np.fromiter((loc.latitude for loc in boxed), dtype=np.float64, count=len(boxed)),
+      np.fromiter((loc.longitude for loc in boxed), dtype=np.float64, count=len(boxed)),
+      approximate=useApproximateDistance(radius)
+    )
+    return [(loc, float(distance)) for loc, distance in zip(boxed, distances) if distance <= radius]
+
+  @staticmethod
+  def getDbNearbyLocations(db: Session, lat: float, lng: float, radius: int = 1000) -> List[dict]:
+    """Get our own locations within radius with average ratings, using the grid index for candidates."""
+    if len(locationIndex):
+      candidates = locationIndex.candidates(lat, lng, radius)
+      ids = list(candidates.keys())
+      coords = np.array(list(candidates.values()), dtype=np.float64).reshape(-1, 2)
+      distances = calculateDistances(lat, lng, coords[:, 0], coords[:, 1], approximate=useApproximateDistance(radius))
+      inRadius = [locationId for locationId, distance in zip(ids, distances) if distance <= radius]
+    else:
+      # Index not built (e.g. outside the app lifecycle), push the bounding box down to SQL
+      inRadius = [loc.id for loc, _ in LocationService.queryLocationsInRadius(db, lat, lng, radius)]
+
+    rows = LocationService.queryWithStats(db).filter(Location.id.in_(inRadius)).all() if inRadius else []
+    return [LocationService.toSummary(loc, stats) for loc, stats in rows]
+
+  @staticmethod
+  def getNearestLocations(
+    db: Session,
+    lat: float,
+    lng: float,
+    limit: int = 20,
+    after: Optional[Tuple[float, str]] = None
+  ) -> Tuple[List[dict], Optional[Tuple[float, str]]]:
+    """Get our own locations closest first, ordered by (distance, id) and resuming after a keyset position.
+
+    Grid rings are scanned outwards and merged into a bounded heap of the best limit candidates; the
+    scan stops once the next ring can't beat the worst one kept. Rings entirely closer than the cursor
+    are skipped, so later pages don't rescan what earlier pages sent. Returns the page and the
+    position to resume from, or None when there is nothing further within nearestMaxRadius.
+    """
+    maxRadius = settings.nearestMaxRadius
+    best: List[Tuple[float, str]] = []
+
+    if len(locationIndex):
+      for r in range(locationIndex.ringsInRadius(lat, lng, maxRadius) + 1):
+        minDistance, maxDistance = locationIndex.ringBounds(lat, r)
+        if minDistance > maxRadius or (len(best) == limit and minDistance > best[-1][0]):
+          break
+        if after is not None and maxDistance < after[0]:
+          continue
+        members = locationIndex.ring(lat, lng, r)
+        if not members:
+          continue
+        coords = np.array(list(members.values()), dtype=np.float64)
+        distances = calculateDistances(lat, lng, coords[:, 0], coords[:, 1])
+        keys = [(float(distance), locationId) for locationId, distance in zip(members, distances) if distance <= maxRadius]
+        if after is not None:
+          keys = [key for key in keys if key > after]
+        best = heapq.nsmallest(limit, itertools.chain(best, keys))
+    else:
+      # Index not built (e.g. outside the app lifecycle), fall back to one bounding box query
+      keys = ((distance, loc.id) for loc, distance in LocationService.queryLocationsInRadius(db, lat, lng, maxRadius))
+      best = heapq.nsmallest(limit, (key for key in keys if after is None or key > after))
+
+    if not best:
+      return [], None
+
+    rows = {
+      loc.id: (loc, stats)
+      for loc, stats in LocationService.queryWithStats(db).filter(Location.id.in_([locationId for _, locationId in best])).all()
+    }
+    results = []
+    for distance, locationId in best:
+      if locationId in rows:
+        results.append({**LocationService.toSummary(*rows[locationId]), "distance": round(distance, 1)})
+    return results, best[-1] if len(best) == limit else None
+
+  @staticmethod
+  def getClusters(
+    db: Session,
+    south: float,
+    north: float,
+    west: float,
+    east: float,
+    zoom: int
+  ) -> List[dict]:
+    """Get marker clusters for a viewport from the cluster index, with each cluster's top-rated location"""
+    clusters = clusterIndex.clusters(south, north, west, east, zoom)
+    topIds = [top[1] for _, _, _, top in clusters if top is not None]
+    rows = {
+      loc.id: (loc, stats)
+      for loc, stats in LocationService.queryWithStats(db).filter(Location.id.in_(topIds)).all()
+    } if topIds else {}
 
-    locations = results + kakaoLocations + tourAPILocations
+    return [
+      {
+        "count": count,
+        "coordinates": {"lat": lat, "lng": lng},
+        "top_location": LocationService.toSummary(*rows[top[1]]) if top is not None and top[1] in rows else None
+      }
+      for count, lat, lng, top in clusters
+    ]
 
-    print(locations)
-    return locations
+  @staticmethod
+  async def getProviderLocations(lat: float, lng: float, radius: int = 1000) -> Tuple[list, bool]:
+    """Get Kakao and TourAPI locations concurrently, and whether every provider answered in time"""
+    key = ("nearby", round(lat, 3), round(lng, 3), radius)
+    kakaoLocations, tourAPILocations = await asyncio.gather(
+      LocationService.callProvider(
+        "Kakao API", key, lambda: LocationService.getKakaoLocations(lat, lng, radius), settings.kakaoDeadlineSeconds
+      ),
+      LocationService.callProvider(
+        "Tour API", key, lambda: LocationService.getTourAPILocations(lat, lng, radius), settings.tourapiDeadlineSeconds
+      )
+    )
+    complete = kakaoLocations is not None and tourAPILocations is not None
+    # Kakao first so its richer address/place_url wins over TourAPI on merge
+    return mergeLocations(kakaoLocations or [], tourAPILocations or []), complete
 
+  @staticmethod
+  async def getNearbyLocations(db: Session, lat: float, lng: float, radius: int = 1000) -> List[dict]:
+    """Get nearby locations from our DB, Kakao and TourAPI concurrently.
+
+    Each external provider has its own deadline; a provider that misses it is dropped from the response.
+    Results are cached per tile and radius bucket (see nearbyCache).
+    """
+    if not settings.nearbyCacheEnabled:
+      results, (providerLocations, _) = await asyncio.gather(
+        asyncio.to_thread(LocationService.getDbNearbyLocations, db, lat, lng, radius),
+        LocationService.getProviderLocations(lat, lng, radius)
+      )
+      # TourAPI is area based and can return places outside the circle
+      return mergeLocations(results, filterInRadius(providerLocations, lat, lng, radius))
+
+    key, entry = nearbyCache.keyFor(lat, lng, radius)
+    # Invalidations after this point make whatever this request fetches unsafe to cache
+    generation = nearbyCache.generation
+    cached = nearbyCache.get(key)
+    fresh = NearbyCacheEntry(entry.centerLat, entry.centerLng, entry.queryRadius)
+    if cached is not None:
+      fresh.dbResults, fresh.dbExpiresAt = cached.dbResults, cached.dbExpiresAt
+      fresh.providerResults, fresh.providerExpiresAt = cached.providerResults, cached.providerExpiresAt
+
+    now = time.monotonic()
+    needDb = fresh.dbResults is None or fresh.dbExpiresAt <= now
+    needProviders = fresh.providerResults is None or fresh.providerExpiresAt <= now
+
+    async def loadDb() -> None:
+      fresh.dbResults = await asyncio.to_thread(
+        LocationService.getDbNearbyLocations, db, fresh.centerLat, fresh.centerLng, fresh.queryRadius
+      )
+      fresh.dbExpiresAt = now + settings.nearbyCacheDbTtlSeconds
+
+    providerLocations = fresh.providerResults
+    async def loadProviders() -> None:
+      nonlocal providerLocations
+      # Providers are queried once for the tile centre, widened like the DB query to cover the whole tile
+      providerLocations, complete = await LocationService.getProviderLocations(
+        fresh.centerLat, fresh.centerLng, ceil(fresh.queryRadius)
+      )
+      if complete:
+        fresh.providerResults = providerLocations
+        fresh.providerExpiresAt = now + settings.nearbyCacheProviderTtlSeconds
+      else:
+        fresh.providerResults = None
+
+    if needDb or needProviders:
+      await asyncio.gather(*([loadDb()] if needDb else []), *([loadProviders()] if needProviders else []))
+      nearbyCache.put(key, fresh, generation)
+
+    # Cached DB and provider hits cover the whole tile, narrow them to this request's circle.
+    # Our own records first so their rating aggregates win on merge
+    return mergeLocations(
+      filterInRadius(fresh.dbResults, lat, lng, radius), filterInRadius(providerLocations, lat, lng, radius)
+    )
 
+  @staticmethod
+  async def streamNearbyLocations(db: Session, lat: float, lng: float, radius: int = 1000) -> AsyncIterator[Tuple[str, List[dict]]]:
+    """Yield (source, locations) batches: our DB hits first, then each provider as it answers.
+
+    Providers start before the DB query so they overlap with it. Each batch only holds places not
+    already sent in an earlier batch; a provider that fails or misses its deadline yields nothing.
+    """
+    key = ("nearby", round(lat, 3), round(lng, 3), radius)
+
+    async def tagged(source: str, provider: str, call, deadline: float):
+      return source, await LocationService.callProvider(provider, key, call, deadline)
+
+    providerTasks = [
+      asyncio.ensure_future(tagged(
+        "kakao", "Kakao API", lambda: LocationService.getKakaoLocations(lat, lng, radius), settings.kakaoDeadlineSeconds
+      )),
+      asyncio.ensure_future(tagged(
+        "tourapi", "Tour API", lambda: LocationService.getTourAPILocations(lat, lng, radius), settings.tourapiDeadlineSeconds
+      ))
+    ]
+    merger = LocationMerger()
+    try:
+      results = await asyncio.to_thread(LocationService.getDbNearbyLocations, db, lat, lng, radius)
+      yield "bapful", merger.addAll(results)
+
+      for nextBatch in asyncio.as_completed(providerTasks):
+        source, locations = await nextBatch
+        # TourAPI is area based and can return places outside the circle
+        locations = filterInRadius(locations, lat, lng, radius)
+        if locations:
+          yield source, merger.addAll(locations)
+    finally:
+      # Client went away or the stream was closed early
+      for task in providerTasks:
+        task.cancel()
 
   @staticmethod
   def getLocationReviews(
     db: Session,
     locationId: str,
     limit: int = 10,
-    offset: int = 0
-  ) -> List[dict]:
-    """Get reviews for a location with pagination"""
-    reviews = db.query(Review, User).join(User).filter(
-      Review.locationId == locationId
-    ).offset(offset).limit(limit).all()
-
-    result = []
-    for review, user in reviews:
-      # Count upvotes and downvotes
-      upvotes = db.query(ReviewRating).filter(
-        and_(ReviewRating.reviewId == review.id, ReviewRating.rating == "up")
-      ).count()
-
-      downvotes = db.query(ReviewRating).filter(
-        and_(ReviewRating.reviewId == review.id, ReviewRating.rating == "down")
-      ).count()
-
-      result.append({
+    after: Optional[Tuple[float, str]] = None
+  ) -> Tuple[List[dict], Optional[Tuple[float, str]]]:
+    """Get a location's reviews, most helpful first, resuming after a (helpfulness, id) keyset position.
+
+    Served from the (locationId, helpfulness, id) index, so every page costs the same as the first.
+    Returns the page and the position to resume from, or None on the last page.
+    """
+    query = db.query(Review, User).join(User).filter(Review.locationId == locationId)
+    if after is not None:
+      query = query.filter(tuple_(Review.helpfulness, Review.id) < tuple_(*after))
+    # One extra row tells whether there is a next page
+    rows = query.order_by(Review.helpfulness.desc(), Review.id.desc()).limit(limit + 1).all()
+
+    reviews = [
+      {
         "id": review.id,
         "user": {"id": user.id, "name": user.name},
         "rating": review.rating,
         "comment": review.comment,
         "timestamp": review.createdAt,
-        "upvotes": upvotes,
-        "downvotes": downvotes
-      })
-
-    return result
+        "upvotes": review.upvotes,
+        "downvotes": review.downvotes
+      }
+      for review, user in rows[:limit]
+    ]
+    last = rows[limit - 1][0] if len(rows) > limit else None
+    return reviews, (last.helpfulness, last.id) if last else None
 
   @staticmethod
-  def searchLocations(
+  async def searchLocations(
     db: Session,
     keyword: str,
     lat: float,
     lng: float
   ) -> List[dict]:
-    """Search for locations"""
-    db_results: List[dict] = []
+    """Search for locations, ranked by the SQLite search indexes when they can serve the keyword"""
     try:
-      query_results = db.query(Location).filter(Location.name.ilike(f"%{keyword}%")).all()
+      rankedIds = searchLocationIds(db, keyword, settings.searchResultLimit)
+      if rankedIds is None:
+        # No search index (non-SQLite databases): same columns, name matches first
+        pattern = f"%{keyword.strip()}%"
+        nameMatch = Location.name.ilike(pattern)
+        query_results = LocationService.queryWithStats(db).filter(or_(
+          nameMatch, Location.address.ilike(pattern), Location.description.ilike(pattern)
+        )).order_by(case((nameMatch, 0), else_=1)).limit(settings.searchResultLimit).all()
+      elif rankedIds:
+        rank = {locationId: i for i, locationId in enumerate(rankedIds)}
+        query_results = LocationService.queryWithStats(db).filter(Location.id.in_(rankedIds)).all()
+        query_results.sort(key=lambda row: rank[row[0].id])
+      else:
+        query_results = []
     except Exception as e:
-      query_results = []
-    except HTTPException as e:
       # No results in internal db
       query_results = []
 
-    for loc in query_results:
-      review_q = db.query(Review).filter(Review.locationId == loc.id)
-      review_count = review_q.count()
-      if review_count:
-        avg_rating = sum(r.rating for r in review_q) / review_count
-      db_results.append({
-            "id": loc.id,
-            "name": loc.name,
-            "location_type": loc.location_type,
-            "coordinates": {"lat": loc.latitude, "lng": loc.longitude},
-            "avg_rating": round(avg_rating, 2),
-            "review_count": review_count
-      })
-    kakao_result = LocationService.getKakaoLocations(lat, lng, 1000, keyword)
-    all_results = db_results + kakao_result
+    db_results: List[dict] = [LocationService.toSummary(loc, stats) for loc, stats in query_results]
+    kakao_result = await LocationService.callProvider(
+      "Kakao API",
+      ("search", keyword, round(lat, 2), round(lng, 2)),
+      lambda: LocationService.getKakaoLocations(lat, lng, 1000, keyword),
+      settings.kakaoDeadlineSeconds
+    ) or []
+    all_results = mergeLocations(db_results, kakao_result)
     return all_results
 
+class LocationStatsService:
+  """Service maintaining the materialized location_stats aggregates"""
+
+  @staticmethod
+  def recordReview(db: Session, locationId: str, rating: int) -> None:
+    """Fold a new review into its location's aggregates (caller commits)"""
+    bucket = getattr(LocationStats, f"rating{rating}")
+    updated = db.query(LocationStats).filter(LocationStats.locationId == locationId).update({
+      LocationStats.ratingSum: LocationStats.ratingSum + rating,
+      LocationStats.reviewCount: LocationStats.reviewCount + 1,
+      LocationStats.avgRating: (LocationStats.ratingSum + rating) * 1.0 / (LocationStats.reviewCount + 1),
+      bucket: bucket + 1
+    }, synchronize_session=False)
+
+    if not updated:
+      db.add(LocationStats(
+        locationId=locationId,
+        avgRating=float(rating),
+        reviewCount=1,
+        ratingSum=rating,
+        **{f"rating{rating}": 1}
+      ))
+
+  @staticmethod
+  def rebuild(db: Session) -> int:
+    """Recompute every location's aggregates from the reviews table"""
+    rows = db.query(
+      Review.locationId,
+      func.count(Review.id),
+      func.coalesce(func.sum(Review.rating), 0),
+      *(func.sum(case((Review.rating == star, 1), else_=0)) for star in RATING_STARS)
+    ).group_by(Review.locationId).all()
+
+    db.query(LocationStats).delete(synchronize_session=False)
+    db.bulk_insert_mappings(LocationStats, [
+      {
+        "locationId": locationId,
+        "avgRating": ratingSum / reviewCount,
+        "reviewCount": reviewCount,
+        "ratingSum": ratingSum,
+        **{f"rating{star}": count for star, count in zip(RATING_STARS, histogram)}
+      }
+      for locationId, reviewCount, ratingSum, *histogram in rows
+    ])
+    db.commit()
+    return len(rows)
+
 class ReviewService:
   """Service for review-related operations"""
 
@@ -287,8 +759,12 @@ class ReviewService:
     )
 
     db.add(dbReview)
+    LocationStatsService.recordReview(db, locationId, rating)
     db.commit()
     db.refresh(dbReview)
+    nearbyCache.invalidateLocation(locationId)
+    avgRating = db.query(LocationStats.avgRating).filter(LocationStats.locationId == locationId).scalar()
+    clusterIndex.updateRating(locationId, avgRating or 0.0)
 
     return {
       "id": reviewId,
@@ -304,36 +780,23 @@ class ReviewService:
     reviewId: str,
     rating: str
   ) -> dict:
-    """Rate a review (up/down vote)"""
-    # Check if user already rated this review
-    existingRating = db.query(ReviewRating).filter(
-      and_(ReviewRating.userId == userId, ReviewRating.reviewId == reviewId)
-    ).first()
-
-    if existingRating:
-      # Update existing rating
-      existingRating.rating = rating
+    """Rate a review (up/down vote).
+
+    While the vote buffer is running the vote is written behind (see VoteBuffer) and the counts
+    returned are optimistic; otherwise it is written now, counters included, in one transaction.
+    """
+    if voteBuffer.running:
+      review = db.query(Review.upvotes, Review.downvotes, ReviewRating.rating).outerjoin(
+        ReviewRating, and_(ReviewRating.reviewId == Review.id, ReviewRating.userId == userId)
+      ).filter(Review.id == reviewId).first()
+      if review is None:
+        raise HTTPException(status_code=404, detail="Review not found")
+      upvotes, downvotes = voteBuffer.add(userId, reviewId, rating, review.rating, review.upvotes, review.downvotes)
     else:
-      # Create new rating
-      ratingId = f"rating_{uuid.uuid4().hex[:8]}"
-      dbRating = ReviewRating(
-        id=ratingId,
-        userId=userId,
-        reviewId=reviewId,
-        rating=rating
-      )
-      db.add(dbRating)
-
-    db.commit()
-
-    # Count total upvotes and downvotes
-    upvotes = db.query(ReviewRating).filter(
-      and_(ReviewRating.reviewId == reviewId, ReviewRating.rating == "up")
-    ).count()
-
-    downvotes = db.query(ReviewRating).filter(
-      and_(ReviewRating.reviewId == reviewId, ReviewRating.rating == "down")
-    ).count()
+      if not db.query(Review.id).filter(Review.id == reviewId).first():
+        raise HTTPException(status_code=404, detail="Review not found")
+      ReviewService.applyVotes(db, {(userId, reviewId): rating})
+      upvotes, downvotes = db.query(Review.upvotes, Review.downvotes).filter(Review.id == reviewId).one()
 
     return {
       "review_id": reviewId,
@@ -341,6 +804,97 @@ class ReviewService:
       "downvotes": downvotes
     }
 
+  @staticmethod
+  def applyVotes(db: Session, votes: Dict[Tuple[str, str], str]) -> None:
+    """Write {(userId, reviewId): rating} votes and their counter changes in one transaction.
+
+    Repeated votes are no-ops and flips move one vote between the counters; counters are changed
+    with one atomic UPDATE per review and helpfulness is re-scored from the result.
+    Votes for reviews that no longer exist are dropped.
+    """
+    try:
+      ReviewService.writeVotes(db, votes)
+    except IntegrityError:
+      # A concurrent first vote by the same user on the same review won the unique constraint;
+      # redo the batch, which now sees that row and applies the vote as an update
+      db.rollback()
+      ReviewService.writeVotes(db, votes)
+
+  @staticmethod
+  def writeVotes(db: Session, votes: Dict[Tuple[str, str], str]) -> None:
+    """One attempt at applyVotes; raises IntegrityError if another writer inserted one of the votes first"""
+    reviewIds = {reviewId for _, reviewId in votes}
+    live = {reviewId for (reviewId,) in db.query(Review.id).filter(Review.id.in_(reviewIds))}
+    # Two plain INs probe the (userId, reviewId) index; a row-value IN would scan review_ratings
+    existing = {
+      (vote.userId, vote.reviewId): vote
+      for vote in db.query(ReviewRating).filter(
+        ReviewRating.userId.in_({userId for userId, _ in votes}),
+        ReviewRating.reviewId.in_(reviewIds)
+      )
+    }
+
+    counters: Dict[str, List[int]] = {}
+    for (userId, reviewId), rating in votes.items():
+      current = existing.get((userId, reviewId))
+      if reviewId not in live or (current and current.rating == rating):
+        continue
+      delta = counters.setdefault(reviewId, [0, 0])
+      if current:
+        # Vote flip: take the old vote off its counter
+        delta[0 if current.rating == "up" else 1] -= 1
+        current.rating = rating
+      else:
+        db.add(ReviewRating(
+          id=f"rating_{uuid.uuid4().hex[:8]}",
+          userId=userId,
+          reviewId=reviewId,
+          rating=rating
+        ))
+      delta[0 if rating == "up" else 1] += 1
+
+    changed = [reviewId for reviewId, delta in counters.items() if delta != [0, 0]]
+    for reviewId in changed:
+      upDelta, downDelta = counters[reviewId]
+      db.query(Review).filter(Review.id == reviewId).update({
+        Review.upvotes: Review.upvotes + upDelta,
+        Review.downvotes: Review.downvotes + downDelta
+      }, synchronize_session=False)
+
+    if changed:
+      # Re-score from the counters this transaction just wrote
+      db.bulk_update_mappings(Review, [
+        {"id": reviewId, "helpfulness": wilsonLowerBound(upvotes, downvotes)}
+        for reviewId, upvotes, downvotes in db.query(Review.id, Review.upvotes, Review.downvotes).filter(Review.id.in_(changed))
+      ])
+    db.commit()
+
+  @staticmethod
+  def reconcileVoteCounts(db: Session) -> Tuple[int, int]:
+    """Recount every review's vote counters from review_ratings and re-score helpfulness.
+
+    Returns (reviews with drifted counters, reviews re-scored).
+    """
+    def votes(rating: str):
+      return select(func.count(ReviewRating.id)).where(
+        ReviewRating.reviewId == Review.id,
+        ReviewRating.rating == rating
+      ).scalar_subquery()
+
+    fixed = db.query(Review).filter(
+      or_(Review.upvotes != votes("up"), Review.downvotes != votes("down"))
+    ).update({Review.upvotes: votes("up"), Review.downvotes: votes("down")}, synchronize_session=False)
+
+    # Re-score anything whose helpfulness no longer matches its (possibly just fixed) counters
+    rescored = []
+    for reviewId, upvotes, downvotes, helpfulness in db.query(Review.id, Review.upvotes, Review.downvotes, Review.helpfulness):
+      score = wilsonLowerBound(upvotes, downvotes)
+      if abs(helpfulness - score) > 1e-12:
+        rescored.append({"id": reviewId, "helpfulness": score})
+    db.bulk_update_mappings(Review, rescored)
+    db.commit()
+    return fixed, len(rescored)
+
 class MenuService:
   """Service for menu-related operations"""
 
@@ -389,6 +943,11 @@ class MenuService:
     )
 
     db.add(dbMenu)
+    if locationId:
+      # Menus are part of the location detail response, so bump its ETag
+      db.query(Location).filter(Location.id == locationId).update(
+        {Location.updatedAt: func.now()}, synchronize_session=False
+      )
     db.commit()
 
     return menuId
@@ -407,77 +966,92 @@ class MenuService:
     ]
 
 class RecommendationService:
-  """Build recommendation sections using existing location & review data."""
+  """Build recommendation sections using existing location & review data"""
+
+  @staticmethod
+  def toItem(loc: Location, stats: Optional[LocationStats]) -> dict:
+    return {
+      "location_id": loc.id,
+      "name": loc.name,
+      "location_type": loc.location_type,
+      "coordinates": {"lat": loc.latitude, "lng": loc.longitude},
+      "avg_rating": round(stats.avgRating, 2) if stats else 0.0,
+      "review_count": stats.reviewCount if stats else 0,
+      "rating_histogram": stats.histogram if stats else [0] * len(RATING_STARS)
+    }
+
+  @staticmethod
+  def buildSections(db: Session) -> Dict[str, List[dict]]:
+    """Rank the non-personal sections (popular, top_rated, new) over every location.
+
+    Run by the background snapshot refresh; keeps recommendationSnapshotSize items per section.
+    """
+    size = settings.recommendationSnapshotSize
+    rows = LocationService.queryWithStats(db).all()
+    rated = [(loc, stats) for loc, stats in rows if stats and stats.reviewCount > 0]
+
+    # Popular (by review count)
+    popular = heapq.nlargest(size, rows, key=lambda row: row[1].reviewCount if row[1] else 0)
+    # Top rated (confidence bound from the star histogram, minimum 1 review)
+    topRated = heapq.nlargest(size, rated, key=lambda row: (ratingLowerBound(row[1].histogram), row[1].reviewCount))
+    # New (most recently added)
+    new = heapq.nlargest(size, rows, key=lambda row: (row[0].createdAt or datetime.min, row[0].id))
+
+    return {
+      category: [RecommendationService.toItem(loc, stats) for loc, stats in ranked]
+      for category, ranked in (("popular", popular), ("top_rated", topRated), ("new", new))
+    }
 
   @staticmethod
   def getRecommendations(
     db: Session,
     lat: Optional[float] = None,
     lng: Optional[float] = None,
-    per_category: int = 8
+    per_category: int = 8,
+    radius: int = 5000
   ) -> List[dict]:
-    # Base locations
-    all_locations = db.query(Location).all()
-    if not all_locations:
-      return []
-
-    # Pre-compute aggregates
-    aggregates = []
-    for loc in all_locations:
-      reviews = db.query(Review).filter(Review.locationId == loc.id).all()
-      review_count = len(reviews)
-      avg_rating = sum(r.rating for r in reviews)/review_count if review_count else 0.0
-      distance = None
-      if lat is not None and lng is not None:
-        distance = calculateDistance(lat, lng, loc.latitude, loc.longitude)
-      aggregates.append({
-        "id": loc.id,
-        "name": loc.name,
-        "location_type": loc.location_type,
-        "lat": loc.latitude,
-        "lng": loc.longitude,
-        "avg_rating": round(avg_rating,2),
-        "review_count": review_count,
-        "distance": distance
-      })
-
-    def section(name: str, items: List[dict]):
-      return {
-        "category": name,
-        "items": [
-          {
-            "location_id": it["id"],
-            "name": it["name"],
-            "location_type": it["location_type"],
-            "coordinates": {"lat": it["lat"], "lng": it["lng"]},
-            "avg_rating": it["avg_rating"],
-            "review_count": it["review_count"],
-            "distance": it["distance"],
-          }
-          for it in items[:per_category]
-        ]
-      }
+    """Serve popular/top_rated/new from the current snapshot and compute nearby for this request"""
+    snapshot = recommendationSnapshots.current
+    if snapshot is None:
+      # Background refresh not started (e.g. outside the app lifecycle) or not finished yet
+      snapshot = recommendationSnapshots.refresh(RecommendationService.buildSections, db)
+
+    def withDistances(items: List[dict]) -> List[dict]:
+      """Copy items with their distance to the request point, None outside the nearby radius"""
+      if lat is None or lng is None or not items:
+        return [{**item, "distance": None} for item in items]
+      distances = calculateDistances(
+        lat, lng,
+        np.fromiter((item["coordinates"]["lat"] for item in items), dtype=np.float64, count=len(items)),
+        np.fromiter((item["coordinates"]["lng"] for item in items), dtype=np.float64, count=len(items)),
+        approximate=useApproximateDistance(radius)
+      )
+      return [
+        {**item, "distance": float(distance) if distance <= radius else None}
+        for item, distance in zip(items, distances)
+      ]
 
-    # Popular (by review count)
-    popular = sorted(aggregates, key=lambda x: x["review_count"], reverse=True)
-    # Top rated (avg rating with minimum 1 review)
-    top_rated = sorted([a for a in aggregates if a["review_count"] > 0], key=lambda x: (x["avg_rating"], x["review_count"]), reverse=True)
-    # Nearby (if distance available)
+    # Nearby (if coordinates given): nearest in the indexed bounding box, stats for the winners only
     nearby = []
     if lat is not None and lng is not None:
-      nearby = sorted([a for a in aggregates if a["distance"] is not None], key=lambda x: x["distance"])
-    # New (recent createdAt) -- fall back to UUID order if createdAt not loaded
-    # For now reuse popular slice as placeholder or we could query ordering by createdAt.
-    new_list = popular  # Placeholder
+      closest = heapq.nsmallest(
+        per_category,
+        LocationService.queryLocationsInRadius(db, lat, lng, radius),
+        key=lambda pair: pair[1]
+      )
+      if closest:
+        stats = {
+          row.locationId: row
+          for row in db.query(LocationStats).filter(LocationStats.locationId.in_([loc.id for loc, _ in closest]))
+        }
+        nearby = [
+          {**RecommendationService.toItem(loc, stats.get(loc.id)), "distance": distance}
+          for loc, distance in closest
+        ]
 
     sections: List[dict] = []
-    if popular:
-      sections.append(section("popular", popular))
-    if top_rated:
-      sections.append(section("top_rated", top_rated))
-    if nearby:
-      sections.append(section("nearby", nearby))
-    if new_list:
-      sections.append(section("new", new_list))
-
-    return sections
\ No newline at end of file
+    for category in ("popular", "top_rated", "nearby", "new"):
+      items = nearby if category == "nearby" else withDistances(list(snapshot.sections.get(category, ())[:per_category]))
+      if items:
+        sections.append({"category": category, "items": items})
+    return sections
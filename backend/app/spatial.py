@@ -0,0 +1,141 @@
+import threading
+from math import cos, radians, floor, pi
+from typing import Dict, List, Tuple, Iterable
+
+from sqlalchemy.orm import Session
+
+from .models import Location
+
+# Metres per degree of latitude (and of longitude at the equator) on the sphere used for
+# haversine distances, so bounding boxes never cut into the circle they enclose
+EARTH_RADIUS = 6371000.0
+METERS_PER_DEGREE = EARTH_RADIUS * pi / 180
+
+def boundingBox(lat: float, lng: float, radius: float) -> Tuple[float, float, float, float]:
+  """Get the (minLat, maxLat, minLng, maxLng) degree box enclosing a circle of radius metres"""
+  dLat = radius / METERS_PER_DEGREE
+  # Clamp cos() near the poles so the longitude span stays finite
+  dLng = radius / (METERS_PER_DEGREE * max(cos(radians(lat)), 0.01))
+  return lat - dLat, lat + dLat, lng - dLng, lng + dLng
+
+class LocationGridIndex:
+  """In-process fixed-degree grid index over Location coordinates"""
+
+  def __init__(self, cellSizeDeg: float = 0.01):
+    # 0.01 deg is roughly 1.1km north-south, which matches the default search radius
+    self.cellSizeDeg = cellSizeDeg
+    self.cells: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = {}
+    self.positions: Dict[str, Tuple[int, int]] = {}
+    self.lock = threading.RLock()
+
+  def cellFor(self, lat: float, lng: float) -> Tuple[int, int]:
+    """Get the grid cell containing a coordinate"""
+    return floor(lat / self.cellSizeDeg), floor(lng / self.cellSizeDeg)
+
+  def add(self, locationId: str, lat: float, lng: float) -> None:
+    """Insert or move a location in the index"""
+    cell = self.cellFor(lat, lng)
+    with self.lock:
+      self.remove(locationId)
+      self.cells.setdefault(cell, {})[locationId] = (lat, lng)
+      self.positions[locationId] = cell
+
+  def remove(self, locationId: str) -> None:
+    """Remove a location from the index"""
+    with self.lock:
+      cell = self.positions.pop(locationId, None)
+      if cell is None:
+        return
+      members = self.cells.get(cell)
+      if members is not None:
+        members.pop(locationId, None)
+        if not members:
+          del self.cells[cell]
+
+  def rebuild(self, rows: Iterable[Tuple[str, float, float]]) -> None:
+    """Replace the index contents with (id, lat, lng) rows"""
+    cells: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = {}
+    positions: Dict[str, Tuple[int, int]] = {}
+    for locationId, lat, lng in rows:
+      cell = self.cellFor(lat, lng)
+      cells.setdefault(cell, {})[locationId] = (lat, lng)
+      positions[locationId] = cell
+    with self.lock:
+      self.cells = cells
+      self.positions = positions
+
+  def rebuildFromDatabase(self, db: Session) -> int:
+    """Load every location's coordinates from the database"""
+    rows = db.query(Location.id, Location.latitude, Location.longitude).all()
+    self.rebuild(rows)
+    return len(rows)
+
+  def cellRange(self, lat: float, lng: float, radius: float) -> Tuple[int, int, int, int]:
+    """Get the (minLat, maxLat, minLng, maxLng) cell indexes overlapping the bounding box of a circle"""
+    south, north, west, east = boundingBox(lat, lng, radius)
+    minLat, minLng = self.cellFor(south, west)
+    maxLat, maxLng = self.cellFor(north, east)
+    return minLat, maxLat, minLng, maxLng
+
+  def cellsInRadius(self, lat: float, lng: float, radius: float) -> List[Tuple[int, int]]:
+    """Get the grid cells overlapping the bounding box of a circle"""
+    minLat, maxLat, minLng, maxLng = self.cellRange(lat, lng, radius)
+    return [(i, j) for i in range(minLat, maxLat + 1) for j in range(minLng, maxLng + 1)]
+
+  def candidates(self, lat: float, lng: float, radius: float) -> Dict[str, Tuple[float, float]]:
+    """Get id -> (lat, lng) for locations in cells overlapping the circle"""
+    minLat, maxLat, minLng, maxLng = self.cellRange(lat, lng, radius)
+    result: Dict[str, Tuple[float, float]] = {}
+    with self.lock:
+      if (maxLat - minLat + 1) * (maxLng - minLng + 1) <= len(self.cells):
+        cells = (
+          self.cells.get((i, j)) for i in range(minLat, maxLat + 1) for j in range(minLng, maxLng + 1)
+        )
+      else:
+        # Box spans more cells than are occupied, scan the occupied ones instead
+        cells = (
+          members for (i, j), members in self.cells.items()
+          if minLat <= i <= maxLat and minLng <= j <= maxLng
+        )
+      for members in cells:
+        if members:
+          result.update(members)
+    return result
+
+  def ringsInRadius(self, lat: float, lng: float, radius: float) -> int:
+    """Get how many rings around the coordinate's cell are needed to cover a circle"""
+    south, north, west, east = boundingBox(lat, lng, radius)
+    ci, cj = self.cellFor(lat, lng)
+    minLat, minLng = self.cellFor(south, west)
+    maxLat, maxLng = self.cellFor(north, east)
+    return max(ci - minLat, maxLat - ci, cj - minLng, maxLng - cj)
+
+  def ring(self, lat: float, lng: float, r: int) -> Dict[str, Tuple[float, float]]:
+    """Get id -> (lat, lng) for locations in the cells exactly r cells (Chebyshev) from the coordinate's cell"""
+    ci, cj = self.cellFor(lat, lng)
+    if r == 0:
+      cells = [(ci, cj)]
+    else:
+      cells = [(ci + di, cj + dj) for di in (-r, r) for dj in range(-r, r + 1)]
+      cells += [(ci + di, cj + dj) for di in range(-r + 1, r) for dj in (-r, r)]
+    result: Dict[str, Tuple[float, float]] = {}
+    with self.lock:
+      for cell in cells:
+        members = self.cells.get(cell)
+        if members:
+          result.update(members)
+    return result
+
+  def ringBounds(self, lat: float, r: int) -> Tuple[float, float]:
+    """Get conservative (min, max) distances in metres from a point to anything in its ring r"""
+    # The point can sit anywhere in its own cell, so ring r starts (r - 1) cells away
+    reach = (r + 1) * self.cellSizeDeg
+    lngScale = max(cos(radians(min(abs(lat) + reach, 90.0))), 0.01)
+    minDistance = max(r - 1, 0) * self.cellSizeDeg * METERS_PER_DEGREE * lngScale * 0.99
+    maxDistance = reach * METERS_PER_DEGREE * 1.5
+    return minDistance, maxDistance
+
+  def __len__(self) -> int:
+    return len(self.positions)
+
+locationIndex = LocationGridIndex()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+from .providers import kakaoClient, tourapiClient, serviceKeyUrl
+
+logger = logging.getLogger(__name__)
+
+# Resolved codes are cached per tile of this size (degrees, roughly 5km)
+RESOLVE_TILE_DEG = 0.05
+RESOLVE_CACHE_SIZE = 4096
+
+class TourAreaCodes:
+  """TourAPI area/sigungu code table, loaded once, cached to disk and refreshed in the background"""
+
+  def __init__(self, cachePath: str):
+    self.cachePath = cachePath
+    # sigungu code (5 digits) -> {"areaCode", "areaName", "sigunguName"}
+    self.sigungu: Dict[str, dict] = {}
+    self.loadedAt: Optional[float] = None
+    self.resolved: "OrderedDict[Tuple[int, int], Tuple[str, str]]" = OrderedDict()
+    self.refreshTask: Optional[asyncio.Task] = None
+
+  def loadFromDisk(self) -> bool:
+    """Load the table from the disk cache, returning False if missing or stale"""
+    try:
+      with open(self.cachePath, encoding="utf-8") as f:
+        data = json.load(f)
+    except (OSError, ValueError):
+      return False
+    if time.time() - data.get("fetchedAt", 0) > settings.tourapiAreaCodeRefreshHours * 3600:
+      return False
+    self.sigungu = data["sigungu"]
+    self.loadedAt = data["fetchedAt"]
+    return True
+
+  def saveToDisk(self) -> None:
+    tmpPath = f"{self.cachePath}.tmp"
+    with open(tmpPath, "w", encoding="utf-8") as f:
+      json.dump({"fetchedAt": self.loadedAt, "sigungu": self.sigungu}, f, ensure_ascii=False)
+    os.replace(tmpPath, self.cachePath)
+
+  async def fetch(self) -> None:
+    """Download the full code list from TourAPI"""
+    # 법정동 region/sigungu code list, the scheme TarRlteTarService1 expects in areaCd/signguCd
+    response = await tourapiClient.get(serviceKeyUrl(settings.tourAPIAreaCodeUrl, settings.tourapiMandatoryKey, {
+      "MobileOS": "ETC",
+      "MobileApp": "Bapful",
+      "lDongListYn": "Y",
+      "numOfRows": 1000,
+      "_type": "json"
+    }))
+    items = response.json()["response"]["body"]["items"]["item"]
+    sigungu = {}
+    for item in items:
+      areaCode = str(item["lDongRegnCd"])
+      code = f"{areaCode}{item['lDongSignguCd']}"
+      sigungu[code] = {
+        "areaCode": areaCode,
+        "areaName": item.get("lDongRegnNm"),
+        "sigunguName": item.get("lDongSignguNm")
+      }
+    self.sigungu = sigungu
+    self.loadedAt = time.time()
+    self.resolved.clear()
+    self.saveToDisk()
+    logger.info(f"Loaded {len(sigungu)} TourAPI sigungu codes")
+
+  async def refreshLoop(self) -> None:
+    """Load from disk if fresh, otherwise fetch; then refresh on a fixed schedule"""
+    interval = settings.tourapiAreaCodeRefreshHours * 3600
+    if not self.loadFromDisk():
+      try:
+        await self.fetch()
+      except Exception as e:
+        logger.warning(f"Failed to load TourAPI area codes: {e}")
+    # A table loaded from disk is refreshed when it reaches the interval's age, not an interval later
+    delay = interval - (time.time() - self.loadedAt) if self.loadedAt else interval
+    while True:
+      await asyncio.sleep(max(delay, 0))
+      delay = interval
+      try:
+        await self.fetch()
+      except Exception as e:
+        logger.warning(f"Failed to refresh TourAPI area codes: {e}")
+
+  def start(self) -> None:
+    if self.refreshTask is None:
+      self.refreshTask = asyncio.create_task(self.refreshLoop())
+
+  async def stop(self) -> None:
+    if self.refreshTask is not None:
+      self.refreshTask.cancel()
+      try:
+        await self.refreshTask
+      except asyncio.CancelledError:
+        pass
+      self.refreshTask = None
+
+  async def resolve(self, lat: float, lng: float) -> Tuple[str, str]:
+    """Resolve a coordinate to TourAPI (areaCd, signguCd).
+
+    The 법정동 code for the coordinate comes from Kakao, once per ~5km tile, and is checked
+    against the loaded table. Falls back to the configured default district.
+    """
+    tile = (int(lat // RESOLVE_TILE_DEG), int(lng // RESOLVE_TILE_DEG))
+    cached = self.resolved.get(tile)
+    if cached is not None:
+      self.resolved.move_to_end(tile)
+      return cached
+
+    codes = (settings.tourapiDefaultAreaCode, settings.tourapiDefaultSigunguCode)
+    try:
+      response = await kakaoClient.get(
+        settings.kakaoRegionAPIUrl,
+        params={"x": lng, "y": lat},
+        headers={"Authorization": f"KakaoAK {settings.kakaomap_restapi_key}"}
+      )
+      for region in response.json().get("documents", []):
+        if region.get("region_type") != "B":
+          continue
+        sigunguCode = region["code"][:5]
+        if not self.sigungu or sigunguCode in self.sigungu:
+          codes = (sigunguCode[:2], sigunguCode)
+        break
+    except Exception as e:
+      # Don't cache failures, the next request retries
+      logger.warning(f"Failed to resolve TourAPI area code for ({lat}, {lng}): {e}")
+      return codes
+
+    self.resolved[tile] = codes
+    while len(self.resolved) > RESOLVE_CACHE_SIZE:
+      self.resolved.popitem(last=False)
+    return codes
+
+tourAreaCodes = TourAreaCodes(settings.tourapiAreaCodeCachePath)
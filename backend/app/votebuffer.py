@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# (userId, reviewId)
+VoteKey = Tuple[str, str]
+
+def voteEffect(rating: Optional[str]) -> Tuple[int, int]:
+  """(upvotes, downvotes) a single vote contributes"""
+  if rating == "up":
+    return 1, 0
+  if rating == "down":
+    return 0, 1
+  return 0, 0
+
+class VoteBuffer:
+  """Write-behind buffer for review votes.
+
+  Votes are coalesced per (userId, reviewId), last one wins, and written in one transaction per
+  flush interval, so vote storms take SQLite's writer lock a few times a second instead of once
+  per click. Each pending vote remembers the persisted vote it replaces (its baseline), which
+  gives per-review count deltas for optimistic responses until the flush lands.
+  """
+
+  def __init__(self):
+    # key -> (baseline, rating)
+    self.pending: Dict[VoteKey, Tuple[Optional[str], str]] = {}
+    # Batch being written by the current flush
+    self.inflight: Dict[VoteKey, Tuple[Optional[str], str]] = {}
+    # reviewId -> [upvotes, downvotes] not yet reflected in the database
+    self.deltas: Dict[str, list] = {}
+    self.apply: Optional[Callable[[Session, Dict[VoteKey, str]], None]] = None
+    self.flushTask: Optional[asyncio.Task] = None
+    self.lock = threading.Lock()
+    self.stats = {"votes": 0, "flushed": 0, "flushes": 0, "failures": 0, "lastFlushSeconds": 0.0}
+
+  @property
+  def running(self) -> bool:
+    return self.flushTask is not None
+
+  def shift(self, reviewId: str, effect: Tuple[int, int], sign: int) -> None:
+    delta = self.deltas.setdefault(reviewId, [0, 0])
+    delta[0] += sign * effect[0]
+    delta[1] += sign * effect[1]
+    if delta == [0, 0]:
+      del self.deltas[reviewId]
+
+  def add(
+    self,
+    userId: str,
+    reviewId: str,
+    rating: str,
+    persisted: Optional[str],
+    upvotes: int,
+    downvotes: int
+  ) -> Tuple[int, int]:
+    """Buffer a vote and get optimistic (upvotes, downvotes) for the review.
+
+    persisted is the user's vote as currently stored and upvotes/downvotes the stored counters.
+    """
+    key = (userId, reviewId)
+    with self.lock:
+      self.stats["votes"] += 1
+      if key in self.pending:
+        baseline, previous = self.pending[key]
+        self.shift(reviewId, voteEffect(previous), -1)
+        self.shift(reviewId, voteEffect(baseline), 1)
+      elif key in self.inflight:
+        # Being written right now; it becomes the stored vote this one replaces
+        baseline = self.inflight[key][1]
+      else:
+        baseline = persisted
+
+      self.pending[key] = (baseline, rating)
+      self.shift(reviewId, voteEffect(baseline), -1)
+      self.shift(reviewId, voteEffect(rating), 1)
+      delta = self.deltas.get(reviewId, [0, 0])
+      return upvotes + delta[0], downvotes + delta[1]
+
+  def flush(self) -> int:
+    """Write every pending vote in one transaction, returning how many were written"""
+    with self.lock:
+      if not self.pending or self.inflight:
+        return 0
+      batch, self.pending, self.inflight = self.pending, {}, self.pending
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+      self.apply(db, {key: rating for key, (_, rating) in batch.items()})
+    except Exception as e:
+      db.rollback()
+      logger.error(f"Failed to flush {len(batch)} buffered votes: {e}")
+      with self.lock:
+        self.stats["failures"] += 1
+        # Requeue behind newer votes for the same key; the deltas already net out to this
+        for key, (baseline, rating) in batch.items():
+          newer = self.pending.get(key)
+          self.pending[key] = (baseline, newer[1] if newer else rating)
+        self.inflight = {}
+      return 0
+    finally:
+      db.close()
+
+    with self.lock:
+      for (_, reviewId), (baseline, rating) in batch.items():
+        self.shift(reviewId, voteEffect(rating), -1)
+        self.shift(reviewId, voteEffect(baseline), 1)
+      self.inflight = {}
+      self.stats["flushed"] += len(batch)
+      self.stats["flushes"] += 1
+      self.stats["lastFlushSeconds"] = round(time.monotonic() - started, 4)
+    return len(batch)
+
+  async def flushLoop(self) -> None:
+    while True:
+      await asyncio.sleep(settings.voteFlushIntervalMs / 1000)
+      try:
+        await asyncio.to_thread(self.flush)
+      except Exception as e:
+        logger.error(f"Vote flush failed: {e}")
+
+  def start(self, apply: Callable[[Session, Dict[VoteKey, str]], None]) -> None:
+    """Start flushing with apply(db, {(userId, reviewId): rating}), which must commit"""
+    self.apply = apply
+    if self.flushTask is None:
+      self.flushTask = asyncio.create_task(self.flushLoop())
+
+  async def stop(self) -> None:
+    """Stop the flush loop and write whatever is still buffered"""
+    if self.flushTask is not None:
+      self.flushTask.cancel()
+      try:
+        await self.flushTask
+      except asyncio.CancelledError:
+        pass
+      self.flushTask = None
+    # A flush cancelled mid-write still finishes in its thread; wait for it before the final one
+    while self.inflight:
+      await asyncio.sleep(0.01)
+    await asyncio.to_thread(self.flush)
+
+  def getStats(self) -> dict:
+    with self.lock:
+      return {"pending": len(self.pending), **self.stats}
+
+voteBuffer = VoteBuffer()
@@ -0,0 +1,167 @@
+"""Local stand-in for the Kakao Local and TourAPI endpoints used by LocationService.
+
+Replays the recorded payloads in bench/fixtures with configurable latency, error rate and payload
+size, so LocationService can be load tested without calling the real APIs. Run from the backend
+directory:
+
+  python -m bench.fakeproviders --port 9000 --latency-ms 80 --jitter-ms 40 --error-rate 0.02 --payload-size 15
+
+and point the app at it (e.g. in .env):
+
+  KAKAOAPIURL=http://127.0.0.1:9000/v2/local/search/keyword.json
+  KAKAOREGIONAPIURL=http://127.0.0.1:9000/v2/local/geo/coord2regioncode.json
+  TOURAPIURL=http://127.0.0.1:9000/B551011/TarRlteTarService1/areaBasedList1
+  TOURAPIAREACODEURL=http://127.0.0.1:9000/B551011/KorService2/ldongCode2
+  KAKAOMAP_RESTAPI_KEY=fake
+"""
+import argparse
+import asyncio
+import copy
+import json
+import random
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+class FakeProviderConfig:
+  """Behaviour knobs, settable from the command line or at runtime via /_config"""
+
+  def __init__(self):
+    self.latencyMs = 50.0
+    self.jitterMs = 25.0
+    self.errorRate = 0.0
+    self.errorStatus = 503
+    self.payloadSize = 10
+    self.fixturesDir = FIXTURES_DIR
+
+config = FakeProviderConfig()
+app = FastAPI(title="Bapful fake providers")
+
+fixtures = {}
+
+def loadFixture(name: str) -> dict:
+  """Get a fresh copy of a recorded payload (read from disk once)"""
+  if name not in fixtures:
+    with open(config.fixturesDir / name, encoding="utf-8") as f:
+      fixtures[name] = json.load(f)
+  return copy.deepcopy(fixtures[name])
+
+async def simulate() -> Optional[JSONResponse]:
+  """Apply latency and maybe fail, returning the error response to send"""
+  await asyncio.sleep((config.latencyMs + random.uniform(0, config.jitterMs)) / 1000)
+  if random.random() < config.errorRate:
+    return JSONResponse(status_code=config.errorStatus, content={"errorType": "FakeProviderError"})
+  return None
+
+def replay(records: list, size: int) -> list:
+  """Cycle recorded records up to size, giving each copy a unique id suffix"""
+  result = []
+  for i in range(size):
+    record = copy.deepcopy(records[i % len(records)])
+    record["_copy"] = i // len(records)
+    result.append(record)
+  return result
+
+@app.get("/v2/local/search/keyword.json")
+async def kakaoKeyword(
+  query: str,
+  x: Optional[float] = Query(None),
+  y: Optional[float] = Query(None),
+  radius: Optional[int] = Query(None)
+):
+  error = await simulate()
+  if error:
+    return error
+  fixture = loadFixture("kakao_keyword.json")
+  documents = fixture["documents"]
+
+  if x is None or y is None:
+    # Geocode lookup (getCoordFromKakao): the top hit for the name
+    top = documents[0]
+    top["place_name"] = query
+    return {"meta": {"total_count": 1, "pageable_count": 1, "is_end": True}, "documents": [top]}
+
+  # Nearby keyword search: recorded places scattered around the requested point
+  spread = (radius or 1000) / 111320.0
+  docs = []
+  for record in replay(documents, config.payloadSize):
+    copyIndex = record.pop("_copy")
+    if copyIndex:
+      record["id"] = f"{record['id']}{copyIndex:03d}"
+      record["place_name"] = f"{record['place_name']} {copyIndex}호점"
+    record["x"] = f"{x + random.uniform(-spread, spread) * 0.7:.6f}"
+    record["y"] = f"{y + random.uniform(-spread, spread) * 0.7:.6f}"
+    docs.append(record)
+  return {"meta": {"total_count": len(docs), "pageable_count": len(docs), "is_end": True}, "documents": docs}
+
+@app.get("/v2/local/geo/coord2regioncode.json")
+async def kakaoRegion(x: float, y: float):
+  error = await simulate()
+  if error:
+    return error
+  return loadFixture("kakao_region.json")
+
+@app.get("/B551011/TarRlteTarService1/areaBasedList1")
+async def tourRelated(numOfRows: int = 10):
+  error = await simulate()
+  if error:
+    return error
+  fixture = loadFixture("tourapi_related.json")
+  items = []
+  for item in replay(fixture["response"]["body"]["items"]["item"], config.payloadSize):
+    copyIndex = item.pop("_copy")
+    if copyIndex:
+      item["tAtsCd"] = f"{item['tAtsCd']}{copyIndex:03d}"
+      item["rlteTatsNm"] = f"{item['rlteTatsNm']} {copyIndex}호점"
+    items.append(item)
+  fixture["response"]["body"]["items"]["item"] = items
+  fixture["response"]["body"]["totalCount"] = len(items)
+  return fixture
+
+@app.get("/B551011/KorService2/ldongCode2")
+async def tourAreaCodes():
+  error = await simulate()
+  if error:
+    return error
+  return loadFixture("tourapi_ldong_codes.json")
+
+@app.post("/_config")
+async def updateConfig(
+  latencyMs: Optional[float] = None,
+  jitterMs: Optional[float] = None,
+  errorRate: Optional[float] = None,
+  payloadSize: Optional[int] = None
+):
+  """Change behaviour mid-run (e.g. to trip the circuit breakers)"""
+  for name, value in (("latencyMs", latencyMs), ("jitterMs", jitterMs), ("errorRate", errorRate), ("payloadSize", payloadSize)):
+    if value is not None:
+      setattr(config, name, value)
+  return vars(config) | {"fixturesDir": str(config.fixturesDir)}
+
+def main() -> None:
+  parser = argparse.ArgumentParser(prog="python -m bench.fakeproviders", description=__doc__.splitlines()[0])
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=9000)
+  parser.add_argument("--latency-ms", type=float, default=config.latencyMs)
+  parser.add_argument("--jitter-ms", type=float, default=config.jitterMs)
+  parser.add_argument("--error-rate", type=float, default=config.errorRate, help="fraction of requests that fail")
+  parser.add_argument("--error-status", type=int, default=config.errorStatus)
+  parser.add_argument("--payload-size", type=int, default=config.payloadSize, help="documents/items per response")
+  parser.add_argument("--fixtures-dir", type=Path, default=config.fixturesDir, help="directory of recorded payloads")
+  args = parser.parse_args()
+
+  config.latencyMs = args.latency_ms
+  config.jitterMs = args.jitter_ms
+  config.errorRate = args.error_rate
+  config.errorStatus = args.error_status
+  config.payloadSize = args.payload_size
+  config.fixturesDir = args.fixtures_dir
+  uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,93 @@
+"""Concurrent load test for /api/locations and /api/locations/search.
+
+Start the fake providers and the API (pointed at them), then from the backend directory:
+
+  python -m bench.loadtest --base-url http://127.0.0.1:8000 --concurrency 32 --requests 2000
+
+Coordinates are jittered around --lat/--lng like real map pans. Reports throughput and
+p50/p95/p99 latency per endpoint.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+import httpx
+
+SEARCH_KEYWORDS = ["짬뽕", "순두부", "커피", "교동짬뽕", "포장마차", "국밥", "막국수"]
+
+def percentile(sortedValues: List[float], p: float) -> float:
+  """Nearest-rank percentile of an already sorted list"""
+  if not sortedValues:
+    return float("nan")
+  rank = max(0, min(len(sortedValues) - 1, round(p / 100 * len(sortedValues) + 0.5) - 1))
+  return sortedValues[rank]
+
+def makeRequest(args: argparse.Namespace):
+  """Pick an endpoint and parameters for one request"""
+  lat = args.lat + random.uniform(-args.jitter, args.jitter)
+  lng = args.lng + random.uniform(-args.jitter, args.jitter)
+  if random.random() < args.search_ratio:
+    return "search", "/api/locations/search", {"query": random.choice(SEARCH_KEYWORDS), "lat": lat, "lng": lng}
+  return "nearby", "/api/locations", {"lat": lat, "lng": lng, "radius": args.radius}
+
+async def worker(client: httpx.AsyncClient, args: argparse.Namespace, remaining: List[int], results: Dict[str, dict]) -> None:
+  while remaining[0] > 0:
+    remaining[0] -= 1
+    name, path, params = makeRequest(args)
+    started = time.perf_counter()
+    try:
+      response = await client.get(path, params=params)
+      ok = response.status_code == 200
+    except httpx.HTTPError:
+      ok = False
+    elapsed = (time.perf_counter() - started) * 1000
+    bucket = results.setdefault(name, {"latencies": [], "errors": 0})
+    bucket["latencies"].append(elapsed)
+    if not ok:
+      bucket["errors"] += 1
+
+async def run(args: argparse.Namespace) -> None:
+  limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+  async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+    # Warm up caches and connection pools so the first requests don't skew the tail
+    for _ in range(min(args.warmup, args.requests)):
+      name, path, params = makeRequest(args)
+      try:
+        await client.get(path, params=params)
+      except httpx.HTTPError:
+        pass
+
+    results: Dict[str, dict] = {}
+    remaining = [args.requests]
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client, args, remaining, results) for _ in range(args.concurrency)))
+    wall = time.perf_counter() - started
+
+  print(f"{args.requests} requests, concurrency {args.concurrency}, {wall:.2f}s, {args.requests / wall:.1f} req/s")
+  print(f"{'endpoint':<8} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+  for name, bucket in sorted(results.items()):
+    latencies = sorted(bucket["latencies"])
+    print(
+      f"{name:<8} {len(latencies):>6} {bucket['errors']:>6} "
+      f"{percentile(latencies, 50):>9.1f} {percentile(latencies, 95):>9.1f} "
+      f"{percentile(latencies, 99):>9.1f} {latencies[-1]:>9.1f}"
+    )
+
+def main() -> None:
+  parser = argparse.ArgumentParser(prog="python -m bench.loadtest", description=__doc__.splitlines()[0])
+  parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+  parser.add_argument("--concurrency", type=int, default=16)
+  parser.add_argument("--requests", type=int, default=1000)
+  parser.add_argument("--warmup", type=int, default=20)
+  parser.add_argument("--lat", type=float, default=37.7635, help="centre latitude (default: Gangneung)")
+  parser.add_argument("--lng", type=float, default=128.8965)
+  parser.add_argument("--jitter", type=float, default=0.01, help="max coordinate jitter in degrees")
+  parser.add_argument("--radius", type=int, default=1000)
+  parser.add_argument("--search-ratio", type=float, default=0.2, help="fraction of requests sent to search")
+  parser.add_argument("--timeout", type=float, default=10.0)
+  asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+  main()
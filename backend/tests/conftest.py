@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point the app at a scratch database before importing it
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bapful-tests-'), 'test.db')}"
@@ -0,0 +1,188 @@
+"""EXPLAIN QUERY PLAN regression checks for hot queries.
+
+Every statement a hot path runs against seeded data is captured and explained; the test fails
+if SQLite plans a full scan of any table, so a dropped index or an unindexable filter shows up
+here instead of in production latency.
+"""
+import asyncio
+import random
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from unittest import mock
+
+import pytest
+from sqlalchemy import event
+
+from app.database import Base, SessionLocal, engine
+from app.models import Chat, ChatMessage, ChatParticipant, Image, Location, Menu, User
+from app.routes import chat as chatRoutes
+from app.search import ensureLocationSearchIndex
+from app.services import LocationService, MenuService, RecommendationService, ReviewService
+from app.spatial import locationIndex
+
+# "SCAN <table>" (optionally "USING [COVERING] INDEX ...") visits every row; virtual tables and
+# constant rows are not full scans
+FULL_SCAN = re.compile(r"^SCAN (?!(\d+ )?CONSTANT ROW)(?!.*VIRTUAL TABLE)(\S+)")
+# Scans of these are over an already filtered subquery result, not a table
+SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+
+@pytest.fixture(scope="module")
+def seeded():
+  Base.metadata.drop_all(bind=engine)
+  Base.metadata.create_all(bind=engine)
+  ensureLocationSearchIndex(engine)
+  locationIndex.rebuild([])
+
+  rng = random.Random(23)
+  db = SessionLocal()
+  users = [User(name=f"user{i}", email=f"user{i}@example.com", hashedPassword="x") for i in range(20)]
+  locations = [
+    Location(
+      name=f"맛집 {i}",
+      location_type="음식점",
+      latitude=37.5 + rng.uniform(-0.05, 0.05),
+      longitude=127.0 + rng.uniform(-0.05, 0.05),
+      address=f"서울 {i}"
+    )
+    for i in range(300)
+  ]
+  db.add_all(users + locations)
+  db.commit()
+
+  started = datetime(2026, 1, 1)
+  for i, location in enumerate(locations[:50]):
+    db.add(Image(locationId=location.id, imageUrl=f"/uploads/{i}.jpg"))
+    db.add(Menu(locationId=location.id, photoUrl=f"/uploads/menu{i}.jpg", translatedItems=[]))
+  db.commit()
+
+  reviewIds = [
+    ReviewService.createReview(db, users[i % 20].id, locations[i % 30].id, rng.randint(1, 5), "좋아요")["id"]
+    for i in range(200)
+  ]
+  for reviewId in reviewIds[:50]:
+    for user in rng.sample(users, 5):
+      ReviewService.applyVotes(db, {(user.id, reviewId): rng.choice(["up", "down"])})
+
+  chats = [Chat() for _ in range(10)]
+  db.add_all(chats)
+  db.flush()
+  for i, chat in enumerate(chats):
+    db.add_all([ChatParticipant(chatId=chat.id, userId=users[i].id), ChatParticipant(chatId=chat.id, userId=users[i + 1].id)])
+    db.add_all([
+      ChatMessage(chatId=chat.id, userId=users[i].id, message="안녕", createdAt=started + timedelta(minutes=m))
+      for m in range(20)
+    ])
+  db.commit()
+
+  yield {"db": db, "users": users, "locations": locations, "reviewIds": reviewIds, "chats": chats}
+  db.close()
+
+@contextmanager
+def capturedStatements():
+  """Collect (sql, parameters) of every SELECT/UPDATE/DELETE run inside the block"""
+  statements: List[Tuple[str, object]] = []
+
+  def capture(conn, cursor, statement, parameters, context, executemany):
+    if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+      statements.append((statement, parameters))
+
+  event.listen(engine, "before_cursor_execute", capture)
+  try:
+    yield statements
+  finally:
+    event.remove(engine, "before_cursor_execute", capture)
+
+def assertNoFullScans(statements: List[Tuple[str, object]]) -> None:
+  assert statements, "no statements captured"
+  with engine.connect() as conn:
+    for statement, parameters in statements:
+      plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+      subqueries = {match.group(1) for match in map(SUBQUERY.match, plan) if match}
+      scans = [
+        detail for detail, match in ((detail, FULL_SCAN.match(detail)) for detail in plan)
+        if match and match.group(2) not in subqueries
+      ]
+      assert not scans, f"full scan {scans} in:\n{statement}\nplan: {plan}"
+
+def test_nearby_bounding_box(seeded):
+  with capturedStatements() as statements:
+    LocationService.getDbNearbyLocations(seeded["db"], 37.5, 127.0, 1000)
+  assertNoFullScans(statements)
+
+def test_nearest_fallback(seeded):
+  with capturedStatements() as statements:
+    LocationService.getNearestLocations(seeded["db"], 37.5, 127.0, 10)
+  assertNoFullScans(statements)
+
+def test_location_detail(seeded):
+  locationId = seeded["locations"][0].id
+  with capturedStatements() as statements:
+    LocationService.getLocationETag(seeded["db"], locationId)
+    LocationService.getLocation(seeded["db"], locationId)
+  assertNoFullScans(statements)
+
+def test_review_feed_pages(seeded):
+  db, locationId = seeded["db"], seeded["locations"][0].id
+  with capturedStatements() as statements:
+    _, after = LocationService.getLocationReviews(db, locationId, 2)
+    LocationService.getLocationReviews(db, locationId, 2, after)
+  assertNoFullScans(statements)
+
+@pytest.mark.parametrize("keyword", ["맛집 1", "맛집", "맛"])
+def test_location_search(seeded, keyword):
+  # Trigram index for 3+ characters, locations_grams below that
+  with mock.patch.object(LocationService, "callProvider", mock.AsyncMock(return_value=None)):
+    with capturedStatements() as statements:
+      results = asyncio.run(LocationService.searchLocations(seeded["db"], keyword, 37.5, 127.0))
+  assert results
+  assertNoFullScans(statements)
+
+def test_location_menus(seeded):
+  with capturedStatements() as statements:
+    MenuService.getLocationMenus(seeded["db"], seeded["locations"][0].id)
+  assertNoFullScans(statements)
+
+def test_create_review(seeded):
+  db, users = seeded["db"], seeded["users"]
+  with capturedStatements() as statements:
+    ReviewService.createReview(db, users[0].id, seeded["locations"][1].id, 4, "또 올게요")
+  assertNoFullScans(statements)
+
+def test_recommendations_skip_reviews(seeded):
+  # top_rated ranks on the location_stats histogram, so no recommendation query reads reviews
+  with capturedStatements() as statements:
+    RecommendationService.getRecommendations(seeded["db"], 37.5, 127.0)
+  assert statements, "no statements captured"
+  assert not [statement for statement, _ in statements if re.search(r"\breviews\b", statement)]
+
+def test_rate_review(seeded):
+  db, users, reviewId = seeded["db"], seeded["users"], seeded["reviewIds"][0]
+  with capturedStatements() as statements:
+    ReviewService.rateReview(db, users[0].id, reviewId, "up")
+    ReviewService.rateReview(db, users[0].id, reviewId, "down")
+  assertNoFullScans(statements)
+
+def test_vote_batch(seeded):
+  db, users, reviewIds = seeded["db"], seeded["users"], seeded["reviewIds"]
+  votes = {(user.id, reviewId): "up" for user in users[:5] for reviewId in reviewIds[:5]}
+  with capturedStatements() as statements:
+    ReviewService.applyVotes(db, votes)
+  assertNoFullScans(statements)
+
+def test_chat_queries(seeded):
+  # The helpers behind routes/chat.py (existing chat lookup, contacts, history, status broadcast)
+  db, user, chat = seeded["db"], seeded["users"][0], seeded["chats"][0]
+  other = seeded["users"][1]
+  with capturedStatements() as statements:
+    assert chatRoutes.chat_manager.get_or_create_chat(db, user.id, other.id).id == chat.id
+    assert chatRoutes.getParticipantIds(db, chat.id) == {user.id, other.id}
+    for participant in chatRoutes.getUserChats(db, user.id):
+      chatRoutes.getOtherParticipants(db, participant.chatId, user.id)
+      chatRoutes.getOtherParticipantWithUser(db, participant.chatId, user.id)
+      chatRoutes.getLastMessage(db, participant.chatId)
+    messages = chatRoutes.queryChatMessages(db, chat.id)
+    messages.count()
+    messages.offset(0).limit(50).all()
+  assertNoFullScans(statements)
@@ -0,0 +1,162 @@
+"""VoteBuffer delta accounting.
+
+A fake store stands in for the reviews/review_ratings tables: votes are applied to it the way
+ReviewService.applyVotes does, so after every step the stored counters plus the buffer's
+pending deltas must equal the counts implied by each user's latest vote.
+"""
+import asyncio
+import threading
+from typing import Dict, Tuple
+
+import pytest
+
+from app.votebuffer import VoteBuffer, voteEffect
+
+class FakeStore:
+  """Persisted votes and per-review counters, written by VoteBuffer.flush through apply()"""
+
+  def __init__(self):
+    self.votes: Dict[Tuple[str, str], str] = {}
+    self.counts: Dict[str, list] = {}
+    self.batches = []
+    self.fail = False
+    # Set to make apply() wait, simulating a slow flush
+    self.release = None
+    self.entered = threading.Event()
+
+  def apply(self, db, votes: Dict[Tuple[str, str], str]) -> None:
+    self.entered.set()
+    if self.release is not None:
+      self.release.wait(5)
+    if self.fail:
+      raise RuntimeError("database is locked")
+    for (userId, reviewId), rating in votes.items():
+      counts = self.counts.setdefault(reviewId, [0, 0])
+      for index, value in enumerate(voteEffect(self.votes.get((userId, reviewId)))):
+        counts[index] -= value
+      for index, value in enumerate(voteEffect(rating)):
+        counts[index] += value
+      self.votes[(userId, reviewId)] = rating
+    self.batches.append(dict(votes))
+
+  def vote(self, buffer: VoteBuffer, userId: str, reviewId: str, rating: str) -> Tuple[int, int]:
+    """Vote the way ReviewService.rateReview does, reading the stored vote and counters"""
+    upvotes, downvotes = self.counts.get(reviewId, [0, 0])
+    return buffer.add(userId, reviewId, rating, self.votes.get((userId, reviewId)), upvotes, downvotes)
+
+def expectedCounts(latest: Dict[Tuple[str, str], str], reviewId: str) -> Tuple[int, int]:
+  upvotes = sum(1 for (_, review), rating in latest.items() if review == reviewId and rating == "up")
+  downvotes = sum(1 for (_, review), rating in latest.items() if review == reviewId and rating == "down")
+  return upvotes, downvotes
+
+def assertConsistent(buffer: VoteBuffer, store: FakeStore, latest: Dict[Tuple[str, str], str]) -> None:
+  for reviewId in {review for _, review in latest}:
+    stored = store.counts.get(reviewId, [0, 0])
+    delta = buffer.deltas.get(reviewId, [0, 0])
+    assert (stored[0] + delta[0], stored[1] + delta[1]) == expectedCounts(latest, reviewId)
+
+@pytest.fixture
+def buffer():
+  return VoteBuffer()
+
+@pytest.fixture
+def store(buffer):
+  store = FakeStore()
+  buffer.apply = store.apply
+  return store
+
+def test_coalesces_and_flushes(buffer, store):
+  assert store.vote(buffer, "u1", "r1", "up") == (1, 0)
+  assert store.vote(buffer, "u1", "r1", "down") == (0, 1)
+  assert store.vote(buffer, "u2", "r1", "up") == (1, 1)
+  assert buffer.getStats()["pending"] == 2
+
+  assert buffer.flush() == 2
+  assert store.batches == [{("u1", "r1"): "down", ("u2", "r1"): "up"}]
+  assert store.counts["r1"] == [1, 1]
+  assert buffer.deltas == {}
+  assert buffer.getStats()["pending"] == 0
+
+def test_flip_back_to_persisted_vote_nets_out(buffer, store):
+  store.vote(buffer, "u1", "r1", "up")
+  buffer.flush()
+
+  assert store.vote(buffer, "u1", "r1", "down") == (0, 1)
+  assert store.vote(buffer, "u1", "r1", "up") == (1, 0)
+  assert buffer.deltas == {}
+
+def test_vote_flipped_while_flush_in_flight(buffer, store):
+  store.vote(buffer, "u1", "r1", "up")
+  store.vote(buffer, "u2", "r1", "up")
+  store.release = threading.Event()
+  flusher = threading.Thread(target=buffer.flush)
+  flusher.start()
+  assert store.entered.wait(5)
+
+  # The in-flight "up" is the baseline this vote replaces, stored counters are still 0/0
+  assert store.vote(buffer, "u1", "r1", "down") == (1, 1)
+  # A second flush must not start while the first is writing
+  assert buffer.flush() == 0
+
+  store.release.set()
+  flusher.join(5)
+  latest = {("u1", "r1"): "down", ("u2", "r1"): "up"}
+  assertConsistent(buffer, store, latest)
+  assert buffer.pending == {("u1", "r1"): ("up", "down")}
+
+  store.release = None
+  assert buffer.flush() == 1
+  assert store.counts["r1"] == [1, 1]
+  assert buffer.deltas == {}
+
+def test_failed_flush_requeues(buffer, store):
+  store.vote(buffer, "u1", "r1", "up")
+  store.vote(buffer, "u2", "r2", "down")
+  store.fail = True
+  assert buffer.flush() == 0
+  assert buffer.getStats()["failures"] == 1
+  assert buffer.inflight == {}
+  latest = {("u1", "r1"): "up", ("u2", "r2"): "down"}
+  assertConsistent(buffer, store, latest)
+
+  store.fail = False
+  assert buffer.flush() == 2
+  assert store.counts == {"r1": [1, 0], "r2": [0, 1]}
+  assert buffer.deltas == {}
+
+def test_failed_flush_keeps_newer_vote(buffer, store):
+  store.vote(buffer, "u1", "r1", "up")
+  store.release = threading.Event()
+  store.fail = True
+  flusher = threading.Thread(target=buffer.flush)
+  flusher.start()
+  assert store.entered.wait(5)
+
+  assert store.vote(buffer, "u1", "r1", "down") == (0, 1)
+  store.release.set()
+  flusher.join(5)
+
+  # The failed "up" never landed, so the newer "down" replaces the original (empty) vote
+  assert buffer.pending == {("u1", "r1"): (None, "down")}
+  assertConsistent(buffer, store, {("u1", "r1"): "down"})
+
+  store.release = None
+  store.fail = False
+  assert buffer.flush() == 1
+  assert store.votes == {("u1", "r1"): "down"}
+  assert store.counts["r1"] == [0, 1]
+  assert buffer.deltas == {}
+
+def test_stop_drains_pending_votes(buffer, store):
+  async def scenario():
+    buffer.start(store.apply)
+    assert buffer.running
+    for user in range(20):
+      store.vote(buffer, f"u{user}", "r1", "up" if user % 3 else "down")
+    await buffer.stop()
+
+  asyncio.run(scenario())
+  assert not buffer.running
+  assert buffer.getStats()["pending"] == 0
+  assert buffer.deltas == {}
+  assert store.counts["r1"] == [13, 7]